@@ -0,0 +1,269 @@
+#!/usr/bin/python3
+# bench.py
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from solvedoku import Board, BoardGenerator, SolveStats, sample_boards
+
+# - Benchmarks that can be run, each timing one call per puzzle
+BENCHMARKS: Dict[str, Callable[[List[List[int]]], Any]] = {
+    'solve': lambda grid: Board(grid).solve(),
+    'solve_recurse': lambda grid: Board(grid).solve_recurse(),
+    'solution_count': lambda grid: Board.solution_count(grid),
+    'grade': lambda grid: Board.grade(grid),
+}
+# - Number of calls to trace when measuring peak memory (tracing slows calls down, so it is kept out of the timings)
+MEMORY_SAMPLE: int = 10
+# - Number of fresh interpreters to time importing solvedoku in, and modules it should not load on import
+IMPORT_RUNS: int = 20
+HEAVY_MODULES: List[str] = ['numpy', 'test_boards', 'concurrent.futures']
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Find a percentile of already sorted values, using the nearest-rank method.
+
+    Args:
+        sorted_values (List[float]): The values, sorted in ascending order
+        pct (float): The percentile, from 0 through 100
+
+    Returns:
+        float: The value at that percentile, or 0 if there are no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, peak_bytes: int) -> Dict[str, float]:
+    """Summarize the latencies of a benchmark.
+
+    Args:
+        latencies (List[float]): The seconds taken by each call
+        errors (int): The number of calls that raised a ValueError or RuntimeError
+        peak_bytes (int): The peak memory allocated by a single call
+
+    Returns:
+        Dict[str, float]: The benchmark's results, with latencies in milliseconds.
+    """
+    sorted_latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'total_s': total,
+        'throughput_per_s': len(latencies) / total if total > 0 else 0.0,
+        'mean_ms': total / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(sorted_latencies, 50) * 1000,
+        'p90_ms': percentile(sorted_latencies, 90) * 1000,
+        'p99_ms': percentile(sorted_latencies, 99) * 1000,
+        'max_ms': (sorted_latencies[-1] if sorted_latencies else 0.0) * 1000,
+        'peak_memory_kb': peak_bytes / 1024,
+    }
+
+
+def peak_memory(func: Callable[[Any], Any], items: List[Any]) -> int:
+    """Measure the largest amount of memory allocated by a single call, over the first MEMORY_SAMPLE items.
+
+    Args:
+        func (Callable[[Any], Any]): The function to call with each item
+        items (List[Any]): The items to call it with
+
+    Returns:
+        int: The peak number of bytes allocated by one call.
+    """
+    peak = 0
+    for item in items[:MEMORY_SAMPLE]:
+        tracemalloc.start()
+        try:
+            func(item)
+        except (ValueError, RuntimeError):
+            pass
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(func: Callable[[Any], Any], items: List[Any]) -> Dict[str, float]:
+    """Time one call of a function per item.
+
+    Args:
+        func (Callable[[Any], Any]): The function to call with each item
+        items (List[Any]): The items to call it with
+
+    Returns:
+        Dict[str, float]: The benchmark's results (see summarize()).
+    """
+    latencies: List[float] = []
+    errors = 0
+    for item in items:
+        start = time.perf_counter()
+        try:
+            func(item)
+        except (ValueError, RuntimeError):
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, errors, peak_memory(func, items))
+
+
+def generate_corpus(count: int, seed: int) -> Dict[str, Any]:
+    """Generate a seeded corpus of puzzles, timing BoardGenerator.generate() along the way.
+
+    Args:
+        count (int): The number of puzzles to generate
+        seed (int): The random seed
+
+    Returns:
+        Dict[str, Any]: 'grids' with the generated puzzles, and 'results' with the generate benchmark's results.
+    """
+    generator = BoardGenerator(seed)
+    grids: List[List[List[int]]] = []
+    latencies: List[float] = []
+    for _ in range(0, count):
+        start = time.perf_counter()
+        grid, _ = generator.generate()
+        latencies.append(time.perf_counter() - start)
+        grids.append(grid)
+    generator = BoardGenerator(seed)
+    peak = peak_memory(lambda _: generator.generate(), [None] * min(count, 2))
+    return {'grids': grids, 'results': summarize(latencies, 0, peak)}
+
+
+def import_time(module: str, runs: int) -> Dict[str, Any]:
+    """Time importing a module in fresh interpreters, leaving out the interpreter's own startup.
+
+    Args:
+        module (str): The name of the module
+        runs (int): The number of interpreters to start
+
+    Returns:
+        Dict[str, Any]: The benchmark's results (see summarize()), plus 'heavy_modules' with the HEAVY_MODULES that the
+            import loaded.
+    """
+    code = f"import sys, time; start = time.perf_counter(); import {module}; " + \
+        f"print(time.perf_counter() - start, *[name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    latencies: List[float] = []
+    heavy: List[str] = []
+    for _ in range(0, runs):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        latencies.append(float(out[0]))
+        heavy = out[1:]
+    results: Dict[str, Any] = summarize(latencies, 0, 0)
+    results['heavy_modules'] = heavy
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare benchmark results against a stored baseline.
+
+    Args:
+        results (Dict[str, Any]): The current results, as saved by this module
+        baseline (Dict[str, Any]): The baseline results, as saved by this module
+        tolerance (float): The allowed slowdown, as a fraction (0.2 allows p50 and mean to be 20% slower)
+
+    Returns:
+        List[str]: A description of each regression found.
+    """
+    regressions: List[str] = []
+    for name, current in results['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None:
+            continue
+        for metric in ('p50_ms', 'mean_ms'):
+            if base[metric] > 0 and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {base[metric]:.3f} -> {current[metric]:.3f} " +
+                                   f"({current[metric] / base[metric] - 1:+.0%})")
+    return regressions
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print a table of benchmark results.
+
+    Args:
+        results (Dict[str, Any]): The results, as saved by this module
+    """
+    print(f"{'benchmark':<16}{'count':>7}{'errors':>7}{'per s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}" +
+          f"{'max ms':>10}{'peak KiB':>10}")
+    for name, res in results['benchmarks'].items():
+        print(f"{name:<16}{res['count']:>7}{res['errors']:>7}{res['throughput_per_s']:>10.1f}{res['p50_ms']:>10.3f}" +
+              f"{res['p90_ms']:>10.3f}{res['p99_ms']:>10.3f}{res['max_ms']:>10.3f}{res['peak_memory_kb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the solver, solution counter, and generator.")
+    parser.add_argument('-b', '--benchmarks', default=','.join(list(BENCHMARKS) + ['generate', 'import']),
+                        help="comma separated benchmarks to run (default: all of them)")
+    parser.add_argument('-n', '--generate', type=int, default=20,
+                        help="number of seeded puzzles to generate and add to the sample boards (default: 20)")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="random seed for the generated puzzles")
+    parser.add_argument('-o', '--output', help="save the results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against results saved by an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.2)")
+    parser.add_argument('-t', '--techniques', action='store_true',
+                        help="also solve the corpus once with per-technique statistics, and report them")
+    parser.add_argument('--import-budget', type=float,
+                        help="fail if the median time to import solvedoku exceeds this many milliseconds, or if the " +
+                        "import loads numpy, test_boards, or the process pool")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.benchmarks.split(',') if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS and name not in ('generate', 'import')]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    corpus = generate_corpus(args.generate, args.seed)
+    grids = [grid for grid, _ in sample_boards()] + corpus['grids']
+    results: Dict[str, Any] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': args.seed,
+        'corpus_size': len(grids),
+        'benchmarks': {},
+    }
+    for name in names:
+        if name == 'generate':
+            results['benchmarks'][name] = corpus['results']
+        elif name == 'import':
+            results['benchmarks'][name] = import_time('solvedoku', IMPORT_RUNS)
+        else:
+            results['benchmarks'][name] = run_benchmark(BENCHMARKS[name], grids)
+    print_results(results)
+
+    if args.techniques:
+        stats = SolveStats()
+        for grid in grids:
+            try:
+                Board(grid).solve(stats)
+            except (ValueError, RuntimeError):
+                pass
+        results['techniques'] = stats.as_dict()
+        print(f"\n{stats}")
+
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(results, out, indent=2)
+    regressions: List[str] = []
+    if args.import_budget is not None:
+        imported = results['benchmarks'].get('import') or import_time('solvedoku', IMPORT_RUNS)
+        if imported['p50_ms'] > args.import_budget:
+            regressions.append(f"import p50_ms: {imported['p50_ms']:.3f} is over the budget of " +
+                               f"{args.import_budget:.3f}")
+        if imported['heavy_modules']:
+            regressions.append(f"import loads {', '.join(imported['heavy_modules'])}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions += compare(results, json.load(file), args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if args.import_budget is not None or args.baseline:
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,470 @@
+#!/usr/bin/python3
+# canonical.py
+import argparse
+import hashlib
+import itertools
+import sys
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+from puzzle_io import format_grid, read_puzzles
+from solvedoku import Board, SolveResult
+
+# - Kinds of column segment kept by canonical_form(): a group of interchangeable columns within one stack, or a set of
+# - interchangeable stacks
+GROUP: int = 0
+STACKS: int = 1
+# - Fewest values a grid with a unique solution can have. Sparser grids skip the cache, as they cannot be solved.
+MIN_GIVENS: int = 17
+
+
+class Transform(NamedTuple):
+    """A symmetry of the Sudoku grid: an optional transposition, then a reordering of rows and columns (keeping rows
+    within their bands and columns within their stacks), then a relabeling of the values."""
+    # - Whether the grid is transposed first
+    transposed: bool
+    # - Row (of the possibly transposed grid) that ends up at each row, and likewise for columns
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    # - New value for each value, indexed by the value (index 0 is unused)
+    relabel: Tuple[int, ...]
+
+    def apply(self, grid: List[List[int]]) -> List[List[int]]:
+        """Apply the transform to a grid.
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+        Returns:
+            List[List[int]]: The transformed grid.
+        """
+        if self.transposed:
+            grid = [list(col) for col in zip(*grid)]
+        relabel = self.relabel
+        return [[None if grid[row][col] is None else relabel[grid[row][col]] for col in self.cols] for row in self.rows]
+
+    def invert(self, grid: List[List[int]]) -> List[List[int]]:
+        """Undo the transform on a grid, e.g. to map the solution of a transformed grid back to the original grid.
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+        Returns:
+            List[List[int]]: The grid before the transform.
+        """
+        unlabel = [0] * 10
+        for val in range(1, 10):
+            unlabel[self.relabel[val]] = val
+        orig: List[List[int]] = [[None] * 9 for _ in range(0, 9)]
+        for idx, row in zip(self.rows, grid):
+            for idy, col_val in zip(self.cols, row):
+                if self.transposed:
+                    orig[idy][idx] = None if col_val is None else unlabel[col_val]
+                else:
+                    orig[idx][idy] = None if col_val is None else unlabel[col_val]
+        return orig
+
+
+def canonical_form(grid: List[List[int]]) -> Tuple[str, Transform]:
+    """Find the canonical form of a grid: the lexicographically smallest of all grids it can be transformed into by
+    transposing, reordering bands, stacks, rows within bands and columns within stacks, and relabeling values. Grids
+    are compared row by row with empty tiles first, and equivalent grids have the same canonical form.
+
+    The canonical grid is built one row at a time, keeping only the partial transforms whose rows so far are the
+    smallest, and values are labeled in the order they first appear. Rather than trying every column order, a partial
+    transform keeps the columns that are identical in every row placed so far as an unordered group (and stacks that
+    are empty in every row so far as an unordered set of stacks), and only orders them as far as the next row tells
+    them apart. Empty rows (and bands) are interchangeable, so only one of them is tried at a time.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+    Raises:
+        TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through 9
+
+    Returns:
+        Tuple[str, Transform]: The canonical grid in the 81-character format (with '.' for empty tiles), and a
+            transform that turns the grid into it.
+    """
+    values = _grid_values(grid)
+    orientations = (values, [values[idy * 9 + idx] for idx in range(0, 9) for idy in range(0, 9)])
+
+    # - Partial transforms as (transposed, rows so far, column segments, relabeling so far, next label). A segment is
+    # - (GROUP, columns) for interchangeable columns of one stack, or (STACKS, stacks) for interchangeable empty stacks.
+    states: List[Tuple[int, Tuple[int, ...], Tuple[Tuple[int, Tuple[int, ...]], ...], Tuple[int, ...], int]] = \
+        [(transposed, (), ((STACKS, (0, 1, 2)),), (0,) * 10, 1) for transposed in range(0, 2)]
+    # - A row is smallest first when its stacks are ordered by how many values it has in them, with its empty tiles
+    # - first in each stack, so only the rows with the smallest sorted per-stack counts can come first
+    first_keys = [[sorted(sum(1 for col in range(stack * 3, stack * 3 + 3) if vals[row * 9 + col])
+                          for stack in range(0, 3)) for row in range(0, 9)] for vals in orientations]
+    first_key = min(min(keys) for keys in first_keys)
+
+    for out_row in range(0, 9):
+        best_row = None
+        next_states = []
+        for transposed, rows, segments, relabel, label in states:
+            vals = orientations[transposed]
+            if out_row % 3:
+                band = rows[-1] // 3
+                candidates = [row for row in range(band * 3, band * 3 + 3) if row not in rows]
+            elif rows:
+                used_bands = {row // 3 for row in rows}
+                candidates = [row for row in range(0, 9) if row // 3 not in used_bands]
+            else:
+                candidates = [row for row in range(0, 9) if first_keys[transposed][row] == first_key]
+            tried_empty = set()
+            for row in candidates:
+                # - Empty rows of a band (or empty bands) are interchangeable
+                if not any(vals[row * 9:row * 9 + 9]):
+                    empty_key = row // 3 if out_row % 3 or any(vals[row // 3 * 27:row // 3 * 27 + 27]) else -1
+                    if empty_key in tried_empty:
+                        continue
+                    tried_empty.add(empty_key)
+                for out, new_segments, new_relabel, new_label in _refine_row(vals, row, segments, relabel, label,
+                                                                             best_row):
+                    if best_row is None or out < best_row:
+                        best_row = out
+                        next_states = []
+                    if out == best_row:
+                        next_states.append((transposed, rows + (row,), new_segments, new_relabel, new_label))
+        states = next_states
+
+    transposed, rows, segments, relabel, label = states[0]
+    cols: List[int] = []
+    for kind, members in segments:
+        cols.extend(members if kind == GROUP else [stack * 3 + pos for stack in members for pos in range(0, 3)])
+    # - Give values that are not in the grid the remaining labels, in order
+    relabel = list(relabel)
+    for val in range(1, 10):
+        if not relabel[val]:
+            relabel[val] = label
+            label += 1
+    transform = Transform(bool(transposed), rows, tuple(cols), tuple(relabel))
+    return (format_grid(transform.apply(grid)), transform)
+
+
+def _refine_row(vals: List[int], row: int, segments: Tuple[Tuple[int, Tuple[int, ...]], ...], relabel: Tuple[int, ...],
+                label: int, bound: List[int] | None) -> List[Tuple[List[int], tuple, Tuple[int, ...], int]]:
+    """Given the column segments of a partial transform, will place a row next and return every way of ordering the
+    segments' columns that makes the row smallest, unless the row cannot be made as small as 'bound'.
+
+    Args:
+        vals (List[int]): The grid's 81 values, 0 for empty tiles
+        row (int): Index of the row
+        segments (Tuple[Tuple[int, Tuple[int, ...]], ...]): The partial transform's column segments
+        relabel (Tuple[int, ...]): The partial transform's relabeling so far
+        label (int): The next unused label
+        bound (List[int] | None): The smallest row found so far by other partial transforms or rows, or None
+
+    Returns:
+        List[Tuple[List[int], tuple, Tuple[int, ...], int]]: The (equally small) relabeled row, and the refined
+            segments, relabeling, and next label of each way, or an empty list if the row is larger than 'bound'.
+    """
+    row_vals = vals[row * 9:row * 9 + 9]
+    if len(segments) == 9:
+        # - Every column is in a segment of its own, so the column order is fixed
+        new_relabel = list(relabel)
+        out = []
+        for _, (col,) in segments:
+            val = row_vals[col]
+            if val and not new_relabel[val]:
+                new_relabel[val] = label
+                label += 1
+            out.append(new_relabel[val])
+        if bound is not None and out > bound:
+            return []
+        return [(out, segments, tuple(new_relabel), label)]
+
+    ways = [([], (), relabel, label)]
+    for kind, members in segments:
+        if kind == GROUP:
+            ways = _best_ways([(out + part, new_segments + part_segments, part_relabel, part_label)
+                               for out, new_segments, way_relabel, way_label in ways
+                               for part, part_segments, part_relabel, part_label in
+                               _refine_group(row_vals, members, way_relabel, way_label)])
+        else:
+            ways = _refine_stacks(row_vals, members, ways)
+        # - Every way has the same values so far, so the row can be given up on as soon as it is larger than the bound
+        if bound is not None:
+            out = ways[0][0]
+            prefix = bound[:len(out)]
+            if out > prefix:
+                return []
+            if out < prefix:
+                bound = None
+    return ways
+
+
+def _refine_stacks(row_vals: List[int], stacks: Tuple[int, ...],
+                   ways: List[Tuple[List[int], tuple, Tuple[int, ...], int]]) \
+        -> List[Tuple[List[int], tuple, Tuple[int, ...], int]]:
+    """Place a row's values in a set of interchangeable empty stacks. Stacks that are empty in the row stay
+    interchangeable and come first, and the others are picked one at a time, smallest first.
+
+    Args:
+        row_vals (List[int]): The row's 9 values, 0 for empty tiles
+        stacks (Tuple[int, ...]): The interchangeable stacks
+        ways (List[Tuple[List[int], tuple, Tuple[int, ...], int]]): The relabeled values, segments, relabeling, and
+            next label of each way of placing the row in the segments before these stacks
+
+    Returns:
+        List[Tuple[List[int], tuple, Tuple[int, ...], int]]: The smallest ways of placing the row up to and including
+            these stacks.
+    """
+    empty = tuple(stack for stack in stacks if not any(row_vals[stack * 3:stack * 3 + 3]))
+    filled = tuple(stack for stack in stacks if stack not in empty)
+    prefix: tuple = ()
+    if len(empty) == 1:
+        prefix = ((GROUP, (empty[0] * 3, empty[0] * 3 + 1, empty[0] * 3 + 2)),)
+    elif empty:
+        prefix = ((STACKS, empty),)
+    # - Ways of placing the row, each with the filled stacks not placed yet
+    picks = [(out + [0] * (3 * len(empty)), segments + prefix, relabel, label, filled)
+             for out, segments, relabel, label in ways]
+    for _ in range(0, len(filled)):
+        best = None
+        next_picks = []
+        for out, segments, relabel, label, left in picks:
+            for stack in left:
+                for part, part_segments, part_relabel, part_label in \
+                        _refine_group(row_vals, (stack * 3, stack * 3 + 1, stack * 3 + 2), relabel, label):
+                    if best is None or part < best:
+                        best = part
+                        next_picks = []
+                    if part == best:
+                        next_picks.append((out + part, segments + part_segments, part_relabel, part_label,
+                                           tuple(other for other in left if other != stack)))
+        picks = next_picks
+    return [(out, segments, relabel, label) for out, segments, relabel, label, _ in picks]
+
+
+def _best_ways(ways: List[Tuple[List[int], tuple, Tuple[int, ...], int]]) \
+        -> List[Tuple[List[int], tuple, Tuple[int, ...], int]]:
+    """Keep the ways of placing a row whose relabeled values are the smallest.
+
+    Args:
+        ways (List[Tuple[List[int], tuple, Tuple[int, ...], int]]): The ways
+
+    Returns:
+        List[Tuple[List[int], tuple, Tuple[int, ...], int]]: The smallest ways.
+    """
+    best = min(way[0] for way in ways)
+    return [way for way in ways if way[0] == best]
+
+
+def _refine_group(row_vals: List[int], cols: Tuple[int, ...], relabel: Tuple[int, ...],
+                  label: int) -> List[Tuple[List[int], tuple, Tuple[int, ...], int]]:
+    """Place a row's values in a group of interchangeable columns, in the order that makes them smallest: empty tiles
+    first, then values that already have a label (smallest label first), then new values. New values get the next
+    labels in the order they are placed, and every order of them is equally small, so each is returned. Columns with
+    the same value stay interchangeable.
+
+    Args:
+        row_vals (List[int]): The row's 9 values, 0 for empty tiles
+        cols (Tuple[int, ...]): The interchangeable columns
+        relabel (Tuple[int, ...]): The relabeling so far
+        label (int): The next unused label
+
+    Returns:
+        List[Tuple[List[int], tuple, Tuple[int, ...], int]]: The relabeled values, refined segments, relabeling, and
+            next label of each smallest way of placing the row.
+    """
+    if len(cols) == 1:
+        val = row_vals[cols[0]]
+        if val and not relabel[val]:
+            new_relabel = list(relabel)
+            new_relabel[val] = label
+            return [([label], ((GROUP, cols),), tuple(new_relabel), label + 1)]
+        return [([relabel[val]], ((GROUP, cols),), relabel, label)]
+
+    classes: Dict[int, List[int]] = {}
+    for col in cols:
+        classes.setdefault(row_vals[col], []).append(col)
+    out: List[int] = []
+    segments: tuple = ()
+    new_vals: List[int] = []
+    for val in sorted(classes, key=lambda val: relabel[val] if val == 0 or relabel[val] else 10):
+        if val == 0 or relabel[val]:
+            out.extend([relabel[val]] * len(classes[val]))
+            segments += ((GROUP, tuple(classes[val])),)
+        else:
+            new_vals.append(val)
+    if not new_vals:
+        return [(out, segments, relabel, label)]
+
+    options = []
+    for order in itertools.permutations(new_vals):
+        new_relabel = list(relabel)
+        new_out = list(out)
+        new_segments = segments
+        new_label = label
+        for val in order:
+            new_relabel[val] = new_label
+            new_out.extend([new_label] * len(classes[val]))
+            new_segments += ((GROUP, tuple(classes[val])),)
+            new_label += 1
+        options.append((new_out, new_segments, tuple(new_relabel), new_label))
+    return options
+
+
+def _grid_values(grid: List[List[int]]) -> List[int]:
+    """Flatten a grid to its 81 values in row-major order, with 0 for empty tiles.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+    Raises:
+        TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through 9
+
+    Returns:
+        List[int]: The values.
+    """
+    try:
+        if len(grid) == 9 and all(len(row) == 9 for row in grid) and \
+                all(col_val is None or (isinstance(col_val, int) and 1 <= col_val <= 9)
+                    for row in grid for col_val in row):
+            return [0 if col_val is None else col_val for row in grid for col_val in row]
+    except TypeError:
+        pass
+    raise TypeError("The given value for 'arr' is not a 9x9 list of integers.")
+
+
+def unique_puzzles(puzzles: Iterable[List[List[int]]]) -> Iterator[Tuple[List[List[int]], str]]:
+    """Lazily drop puzzles that are equivalent to an earlier puzzle. Only a 16-byte digest of each canonical form seen
+    is kept in memory.
+
+    Args:
+        puzzles (Iterable[List[List[int]]]): The puzzles
+
+    Raises:
+        TypeError: If a puzzle has the wrong dimensions, or contains values that are not integers from 1 through 9
+
+    Yields:
+        Tuple[List[List[int]], str]: The first puzzle of each set of equivalent puzzles, in input order, and its
+            canonical form.
+    """
+    seen = set()
+    for puzzle in puzzles:
+        key = canonical_form(puzzle)[0]
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        if digest not in seen:
+            seen.add(digest)
+            yield (puzzle, key)
+
+
+class CacheInfo(NamedTuple):
+    """Hit and miss statistics of a SolutionCache."""
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class SolutionCache:
+    """A bounded LRU cache of solutions in front of Board.solve(), keyed by canonical form, so that a puzzle equivalent
+    to one solved before (relabeled, transposed, or with rows, columns, bands or stacks reordered) is answered by
+    mapping the cached solution back through the inverse transform instead of solving it again.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        """Initialize a new, empty cache
+
+        Args:
+            maxsize (int): The maximum number of solutions to keep (the least recently used is evicted first)
+
+        Raises:
+            ValueError: If maxsize is less than 1.
+        """
+        if maxsize < 1:
+            raise ValueError("A solution cache needs a maxsize of at least 1.")
+        self.maxsize: int = maxsize
+        # - Solution of each canonical grid, least recently used first
+        self.__solutions: OrderedDict[str, List[List[int]]] = OrderedDict()
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    def solve(self, grid: List[List[int]]) -> List[List[int]]:
+        """Solve a grid, using the cached solution of an equivalent grid if there is one.
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+        Raises:
+            TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through 9
+            ValueError: If the grid is invalid, or does not have a unique solution (errors are not cached).
+            RuntimeError: If the grid cannot be solved with the currently implemented methods.
+
+        Returns:
+            List[List[int]]: The solved grid.
+        """
+        if sum(1 for val in _grid_values(grid) if val) < MIN_GIVENS:
+            self.__misses += 1
+            b = Board(grid)
+            b.solve()
+            return b.grid
+
+        key, transform = canonical_form(grid)
+        solution = self.__solutions.get(key)
+        if solution is not None:
+            self.__hits += 1
+            self.__solutions.move_to_end(key)
+            return transform.invert(solution)
+
+        self.__misses += 1
+        b = Board(grid)
+        b.solve()
+        self.__solutions[key] = transform.apply(b.grid)
+        if len(self.__solutions) > self.maxsize:
+            self.__solutions.popitem(last=False)
+            self.__evictions += 1
+        return b.grid
+
+    def info(self) -> CacheInfo:
+        """Get the cache's hit and miss statistics.
+
+        Returns:
+            CacheInfo: The number of hits, misses, and evictions so far, and the cache's maximum and current size.
+        """
+        return CacheInfo(self.__hits, self.__misses, self.__evictions, self.maxsize, len(self.__solutions))
+
+    def clear(self) -> None:
+        """Remove every cached solution and reset the statistics."""
+        self.__solutions.clear()
+        self.__hits = self.__misses = self.__evictions = 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Drop puzzles that are equivalent (under relabeling, transposition, " +
+                                     "and row, column, band and stack reordering) to an earlier puzzle.")
+    parser.add_argument('inputs', nargs='*', default=['-'], help="puzzle files ('-' for stdin, the default)")
+    parser.add_argument('-o', '--output', default='-', help="file to write results to ('-' for stdout, the default)")
+    parser.add_argument('--canonical', action='store_true', help="write each puzzle's canonical form instead")
+    args = parser.parse_args()
+
+    counts = {'read': 0, 'written': 0, 'skipped': 0}
+
+    def all_puzzles() -> Iterator[List[List[int]]]:
+        for source in args.inputs:
+            for puzzle in read_puzzles(source):
+                if isinstance(puzzle, SolveResult):
+                    print(puzzle.error, file=sys.stderr)
+                    counts['skipped'] += 1
+                    continue
+                counts['read'] += 1
+                yield puzzle
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for puzzle, key in unique_puzzles(all_puzzles()):
+            out.write((key if args.canonical else format_grid(puzzle)) + '\n')
+            counts['written'] += 1
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Read {counts['read']} puzzles, wrote {counts['written']} unique puzzles " +
+          f"({counts['read'] - counts['written']} duplicates, {counts['skipped']} invalid lines skipped).",
+          file=sys.stderr)
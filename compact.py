@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# compact.py
+from array import array
+from typing import List
+from solvedoku import Board
+
+
+class CompactBoard:
+    """A Board's state packed into flat arrays, for keeping very many (e.g. partially solved) boards in memory.
+
+    A CompactBoard holds the original values in 81 bytes, the current values in an array('B'), and the candidate
+    bitmasks in an array('H'), all indexed by idx * 9 + idy with 0 for empty tiles. Unit masks and the number of
+    unsolved tiles are not stored, since they follow from the current values. Copies share the (immutable) original
+    values, and pickles hold the raw bytes.
+    """
+    __slots__ = ('givens', 'digits', 'cands')
+
+    def __init__(self, givens: bytes, digits: bytes, cands: bytes) -> None:
+        """Initialize a new CompactBoard from raw bytes (see from_board() and from_grid() to convert a Board or grid)
+
+        Args:
+            givens (bytes): The 81 original values, 0 for empty tiles
+            digits (bytes): The 81 current values, 0 for empty tiles
+            cands (bytes): The 81 candidate bitmasks, as packed by array('H').tobytes() (in native byte order)
+
+        Raises:
+            ValueError: If the bytes do not hold 81 values each.
+        """
+        self.givens: bytes = bytes(givens)
+        self.digits: array = array('B', digits)
+        self.cands: array = array('H')
+        self.cands.frombytes(cands)
+        if len(self.givens) != 9 * 9 or len(self.digits) != 9 * 9 or len(self.cands) != 9 * 9:
+            raise ValueError("A CompactBoard needs 81 original values, current values, and candidate bitmasks.")
+
+    @classmethod
+    def from_board(cls, board: Board) -> 'CompactBoard':
+        """Pack a Board, as it stands (it may be partially solved).
+
+        Args:
+            board (Board): The Board to pack
+
+        Raises:
+            ValueError: If the Board is not 9x9.
+
+        Returns:
+            CompactBoard: The packed Board.
+        """
+        if board.order != 3:
+            raise ValueError("A CompactBoard can only hold a 9x9 Board.")
+        compact = cls.__new__(cls)
+        compact.givens = bytes(col_val or 0 for row in board.grid_orig for col_val in row)
+        compact.digits = array('B', [col_val or 0 for row in board.grid for col_val in row])
+        compact.cands = array('H', board.cands)
+        return compact
+
+    @classmethod
+    def from_grid(cls, grid: List[List[int]]) -> 'CompactBoard':
+        """Pack a new, unsolved, Board.
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+        Raises:
+            TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through 9
+            ValueError: If grid is not 9x9.
+
+        Returns:
+            CompactBoard: The packed Board.
+        """
+        return cls.from_board(Board(grid))
+
+    def to_board(self) -> Board:
+        """Unpack into a Board, with the same original values, current values, and candidates.
+
+        Returns:
+            Board: The unpacked Board.
+        """
+        board = Board(self.grid)
+        board.grid_orig = self.grid_orig
+        board.cands = self.cands.tolist()
+        return board
+
+    @property
+    def grid(self) -> List[List[int]]:
+        """The current values, as a 9x9 2D array of integers from 1 through 9, or None for empty tiles."""
+        return [[self.digits[idx * 9 + idy] or None for idy in range(0, 9)] for idx in range(0, 9)]
+
+    @property
+    def grid_orig(self) -> List[List[int]]:
+        """The original values, as a 9x9 2D array of integers from 1 through 9, or None for empty tiles."""
+        return [[self.givens[idx * 9 + idy] or None for idy in range(0, 9)] for idx in range(0, 9)]
+
+    @property
+    def unsolved(self) -> int:
+        """The number of empty tiles."""
+        return self.digits.count(0)
+
+    def copy(self) -> 'CompactBoard':
+        """Copy the board. The original values are immutable, so they are shared with the copy.
+
+        Returns:
+            CompactBoard: The copy.
+        """
+        compact = CompactBoard.__new__(CompactBoard)
+        compact.givens = self.givens
+        compact.digits = self.digits[:]
+        compact.cands = self.cands[:]
+        return compact
+
+    def __copy__(self) -> 'CompactBoard':
+        return self.copy()
+
+    def __deepcopy__(self, memo: dict) -> 'CompactBoard':
+        return self.copy()
+
+    def __reduce__(self) -> tuple:
+        return (CompactBoard, (self.givens, self.digits.tobytes(), self.cands.tobytes()))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactBoard):
+            return NotImplemented
+        return self.givens == other.givens and self.digits == other.digits and self.cands == other.cands
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Represent the board by its current values in the 81-character format.
+
+        Returns:
+            str: The string representation of the board.
+        """
+        return f"CompactBoard('{''.join(str(val) if val else '.' for val in self.digits)}')"
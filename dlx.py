@@ -0,0 +1,282 @@
+#!/usr/bin/python3
+# dlx.py
+import math
+from typing import Iterator, List, Sequence, Tuple
+
+
+class DancingLinks:
+    """Knuth's Algorithm X over a sparse exact cover matrix, using dancing links.
+
+    Node 0 is the root, nodes 1 through num_cols are the column headers, and every other node is a 1 in the matrix.
+    The links are kept in flat lists of node indices, so covering and uncovering a column never allocates.
+    """
+
+    def __init__(self, num_cols: int, rows: Sequence[Sequence[int]]) -> None:
+        """Initialize a new exact cover matrix
+
+        Args:
+            num_cols (int): The number of columns (constraints) that each have to be covered exactly once
+            rows (Sequence[Sequence[int]]): For each row (choice), the columns from 0 through num_cols - 1 it covers
+        """
+        num_nodes = num_cols + 1
+        self.left: List[int] = [num_cols] + list(range(0, num_cols))
+        self.right: List[int] = list(range(1, num_nodes)) + [0]
+        self.up: List[int] = list(range(0, num_nodes))
+        self.down: List[int] = list(range(0, num_nodes))
+        self.col: List[int] = list(range(0, num_nodes))
+        self.size: List[int] = [0] * num_nodes
+        self.row_id: List[int] = [-1] * num_nodes
+
+        left, right, up, down, col = self.left, self.right, self.up, self.down, self.col
+        for row_num, row in enumerate(rows):
+            first = -1
+            for col_num in row:
+                header = col_num + 1
+                node = len(col)
+                # - Link the node in at the bottom of its column
+                up.append(up[header])
+                down.append(header)
+                down[up[header]] = node
+                up[header] = node
+                col.append(header)
+                self.row_id.append(row_num)
+                self.size[header] += 1
+                # - Link the node in at the end of its row
+                if first < 0:
+                    first = node
+                    left.append(node)
+                    right.append(node)
+                else:
+                    left.append(left[first])
+                    right.append(first)
+                    right[left[first]] = node
+                    left[first] = node
+
+    def __cover(self, header: int) -> None:
+        """Remove a column from the header list, and every row that covers it from the other columns.
+
+        Args:
+            header (int): The column's header node
+        """
+        left, right, up, down, col, size = self.left, self.right, self.up, self.down, self.col, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        node = down[header]
+        while node != header:
+            other = right[node]
+            while other != node:
+                down[up[other]] = down[other]
+                up[down[other]] = up[other]
+                size[col[other]] -= 1
+                other = right[other]
+            node = down[node]
+
+    def __uncover(self, header: int) -> None:
+        """Undo self.__cover(), restoring the links in the exact reverse order.
+
+        Args:
+            header (int): The column's header node
+        """
+        left, right, up, down, col, size = self.left, self.right, self.up, self.down, self.col, self.size
+        node = up[header]
+        while node != header:
+            other = left[node]
+            while other != node:
+                size[col[other]] += 1
+                down[up[other]] = other
+                up[down[other]] = other
+                other = left[other]
+            node = up[node]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def __choose(self) -> int:
+        """Find the uncovered column with the fewest rows left (Knuth's S heuristic).
+
+        Returns:
+            int: The column's header node.
+        """
+        right, size = self.right, self.size
+        best = right[0]
+        best_size = size[best]
+        header = right[best]
+        while header != 0 and best_size > 1:
+            if size[header] < best_size:
+                best = header
+                best_size = size[header]
+            header = right[header]
+        return best
+
+    def search(self, limit: int | None = None) -> Iterator[List[int]]:
+        """Find exact covers of the matrix. The search is iterative, so it is not bound by the recursion limit, and the
+        matrix is restored when the iterator is exhausted or closed early.
+
+        Args:
+            limit (int | None): The maximum number of exact covers to find, or None to find all of them
+
+        Yields:
+            List[int]: The row numbers making up each exact cover.
+        """
+        right, down, left, col = self.right, self.down, self.left, self.col
+        # - Rows (nodes) chosen so far, one per level of the search
+        chosen: List[int] = []
+        found = 0
+        if right[0] == 0:
+            yield []
+            return
+        header = self.__choose()
+        self.__cover(header)
+        node = down[header]
+        try:
+            while True:
+                if node == header:
+                    # - Every row of this level's column has been tried, go back up a level
+                    self.__uncover(header)
+                    if not chosen:
+                        return
+                    node = chosen.pop()
+                    header = col[node]
+                    other = left[node]
+                    while other != node:
+                        self.__uncover(col[other])
+                        other = left[other]
+                    node = down[node]
+                    continue
+
+                # - Choose this row, covering every other column it has a 1 in
+                other = right[node]
+                while other != node:
+                    self.__cover(col[other])
+                    other = right[other]
+                chosen.append(node)
+
+                if right[0] == 0:
+                    yield [self.row_id[row_node] for row_node in chosen]
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+                    # - Unchoose the row and try the next one in the same column
+                    node = chosen.pop()
+                    other = left[node]
+                    while other != node:
+                        self.__uncover(col[other])
+                        other = left[other]
+                    node = down[node]
+                    continue
+
+                header = self.__choose()
+                self.__cover(header)
+                node = down[header]
+        finally:
+            # - Restore the matrix if the search was stopped while rows were still chosen
+            while chosen:
+                node = chosen.pop()
+                other = left[node]
+                while other != node:
+                    self.__uncover(col[other])
+                    other = left[other]
+                self.__uncover(col[node])
+
+    def count(self, limit: int | None = None) -> int:
+        """Count the exact covers of the matrix.
+
+        Args:
+            limit (int | None): Stop counting once this many exact covers are found, or None to count all of them
+
+        Returns:
+            int: The number of exact covers found.
+        """
+        return sum(1 for _ in self.search(limit))
+
+
+def sudoku_exact_cover(grid: List[List[int]]) -> Tuple[DancingLinks, List[Tuple[int, int, int]]]:
+    """Build the exact cover matrix for a 9x9 Sudoku grid. The full matrix has 324 columns (a value in each tile, each
+    value in each row, each value in each column, and each value in each block) and 729 rows (each value in each tile).
+    Columns already covered by the grid's values, and rows that conflict with them, are left out. Larger grids of order
+    n (n^2 x n^2 tiles) work the same way, with 4 * n^4 columns and n^6 rows.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles (or an
+                                n^2 x n^2 array of integers from 1 through n^2)
+
+    Raises:
+        ValueError: If the values in the grid conflict with each other, or the grid is not n^2 x n^2 tiles.
+
+    Returns:
+        Tuple[DancingLinks, List[Tuple[int, int, int]]]: The exact cover matrix, and the (row index, column index,
+            value) that each of its rows stands for.
+    """
+    order = math.isqrt(len(grid))
+    size = order * order
+    if size != len(grid) or any(len(row) != size for row in grid):
+        raise ValueError(f"A Sudoku grid must be n^2 x n^2 tiles, got {len(grid)} rows.")
+    covered = [False] * (4 * size * size)
+    for idx, row in enumerate(grid):
+        for idy, col_val in enumerate(row):
+            if col_val is not None:
+                val = col_val - 1
+                for constraint in _constraints(idx, idy, val, order):
+                    if covered[constraint]:
+                        raise ValueError("The given board is invalid (there is no valid solution).")
+                    covered[constraint] = True
+
+    # - Number the remaining columns from 0
+    col_nums: List[int] = []
+    num_cols = 0
+    for is_covered in covered:
+        col_nums.append(-1 if is_covered else num_cols)
+        num_cols += not is_covered
+
+    rows: List[List[int]] = []
+    choices: List[Tuple[int, int, int]] = []
+    for idx, row in enumerate(grid):
+        for idy, col_val in enumerate(row):
+            if col_val is None:
+                for val in range(0, size):
+                    constraints = _constraints(idx, idy, val, order)
+                    if not any(covered[constraint] for constraint in constraints):
+                        rows.append([col_nums[constraint] for constraint in constraints])
+                        choices.append((idx, idy, val + 1))
+    return (DancingLinks(num_cols, rows), choices)
+
+
+def sudoku_solutions(grid: List[List[int]], limit: int | None = None) -> Iterator[List[List[int]]]:
+    """Find the solutions of a 9x9 (or n^2 x n^2) Sudoku grid with Algorithm X.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles (or an
+                                n^2 x n^2 array of integers from 1 through n^2)
+        limit (int | None): The maximum number of solutions to find, or None to find all of them
+
+    Raises:
+        ValueError: If the values in the grid conflict with each other.
+
+    Yields:
+        List[List[int]]: Each solved grid.
+    """
+    matrix, choices = sudoku_exact_cover(grid)
+    for cover in matrix.search(limit):
+        solution = [list(row) for row in grid]
+        for row_num in cover:
+            idx, idy, val = choices[row_num]
+            solution[idx][idy] = val
+        yield solution
+
+
+def _constraints(idx: int, idy: int, val: int, order: int = 3) -> Tuple[int, int, int, int]:
+    """Given a tile and a value from 0 through 8, will return the 4 exact cover columns that placing it covers.
+
+    Args:
+        idx (int): row index from 0 through 8
+        idy (int): column index from 0 through 8
+        val (int): value from 0 through 8
+        order (int): The grid order (3 for a 9x9 grid, where indices and values go up to n^2 - 1 for order n)
+
+    Returns:
+        Tuple[int, int, int, int]: The tile, row, column, and block constraint columns.
+    """
+    size = order * order
+    num_cells = size * size
+    block_num = (idx // order) * order + idy // order
+    return (idx * size + idy, num_cells + idx * size + val, 2 * num_cells + idy * size + val,
+            3 * num_cells + block_num * size + val)
@@ -1,16 +1,104 @@
 #!/usr/bin/python3
 # main.py
+import multiprocessing
 import numpy as np
-from typing import List
+from multiprocessing.connection import Connection
+from typing import Callable, List, Tuple
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.core.window import Window
 from kivy.uix.screenmanager import Screen
-from solvedoku import Board, BoardGenerator
+from solvedoku import Board, SolveResult, solve_one
+from puzzle_pool import DEFAULT_DIFFICULTY, PuzzlePool
+
+# - Solver processes are forked where the platform allows it. A spawned process re-imports this module, so the Kivy
+# - window is only imported where it is used, and never while this module is being imported.
+SOLVE_CONTEXT = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+
+
+def solve_in_process(conn: Connection, grid: List[List[int]]) -> None:
+    """Solve a puzzle in a worker process, sending the SolveResult back through a pipe.
+
+    Args:
+        conn (Connection): The worker's end of the pipe
+        grid (List[List[int]]): The puzzle to solve
+    """
+    conn.send(solve_one(grid))
+    conn.close()
+
+
+class BackgroundSolve:
+    """Solves a puzzle in a separate process, so a hard puzzle never blocks the event loop, and delivers the result
+    back on the UI thread through the Kivy clock. A process (unlike a thread) can be stopped part way through, so the
+    solve can be cancelled.
+    """
+
+    def __init__(self, grid: List[List[int]], on_done: Callable[[SolveResult], None], poll_interval: float = 0.05):
+        self.on_done = on_done
+        self.conn, child_conn = SOLVE_CONTEXT.Pipe(duplex=False)
+        self.process = SOLVE_CONTEXT.Process(target=solve_in_process, args=(child_conn, grid), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.event = Clock.schedule_interval(self.poll, poll_interval)
+
+    def poll(self, dt) -> None:
+        # - Check whether the process is alive before checking the pipe: a process that sends its result and exits in
+        # - between would otherwise look like it stopped without a result
+        alive = self.process.is_alive()
+        if not self.conn.poll():
+            if not alive:
+                self.finish(SolveResult(None, RuntimeError("The solver stopped without a result.")))
+            return
+        try:
+            result = self.conn.recv()
+        except EOFError:
+            result = SolveResult(None, RuntimeError("The solver stopped without a result."))
+        self.finish(result)
+
+    def finish(self, result: SolveResult) -> None:
+        self.close()
+        self.on_done(result)
+
+    def cancel(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.close()
+
+    def close(self) -> None:
+        self.event.cancel()
+        self.conn.close()
+        self.process.join(timeout=1)
+
+
+class PendingPuzzle:
+    """Waits for the puzzle pool's refill thread to have a puzzle ready, checking through the Kivy clock, so that
+    generating a board never blocks the event loop even when the pool has run dry.
+    """
+
+    def __init__(self, pool: PuzzlePool, on_done: Callable[[Tuple[List[List[int]], List[List[int]]]], None],
+                 difficulty: str = DEFAULT_DIFFICULTY, poll_interval: float = 0.05):
+        self.pool = pool
+        self.on_done = on_done
+        self.difficulty = difficulty
+        self.event = Clock.schedule_interval(self.poll, poll_interval)
+
+    def poll(self, dt) -> None:
+        if not self.pool.ready(self.difficulty):
+            return
+        puzzle = self.pool.get(self.difficulty, block=False)
+        if puzzle is not None:
+            self.close()
+            self.on_done(puzzle)
+
+    def cancel(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.event.cancel()
 
 
 class Tile(TextInput):
@@ -72,6 +160,7 @@ class SudokuBoard(GridLayout):
         self.tiles: List[List[Tile]] = np.full((9, 9), None)
         self.notes = notes
         self.solution: List[List[int]] = None
+        from kivy.core.window import Window
         Window.bind(on_resize=self.on_window_resize)
 
         for idx in range(0, 9):
@@ -203,6 +292,7 @@ class NotesBoard(GridLayout):
 class OverlayScreen(Screen):
     def __init__(self, **kwargs):
         super(OverlayScreen, self).__init__(**kwargs)
+        from kivy.core.window import Window
         self.size = Window.size
         self.notes = NotesBoard()
         self.board = SudokuBoard(self.notes.tiles)
@@ -222,18 +312,20 @@ class ActButton(Button):
 
 
 class ActionRow(BoxLayout):
-    def __init__(self, board: SudokuBoard, notes: NotesBoard, **kwargs):
+    def __init__(self, board: SudokuBoard, notes: NotesBoard, pool: PuzzlePool, **kwargs):
         super(ActionRow, self).__init__(**kwargs)
         self.orientation = 'horizontal'
         self.spacing = 10
         self.board = board
         self.notes = notes
+        self.pool = pool
+        self.task: BackgroundSolve | PendingPuzzle = None
 
         toggle_notes_btn = ActButton(text="Toggle\nNotes")
         toggle_notes_btn.bind(on_press=self.callback_toggle_notes)
 
-        verify_btn = ActButton(text="Verify")
-        verify_btn.bind(on_press=self.callback_verify)
+        self.verify_btn = ActButton(text="Verify")
+        self.verify_btn.bind(on_press=self.callback_verify)
 
         gen_notes_btn = ActButton(text="Generate\nNotes")
         gen_notes_btn.bind(on_press=self.callback_gen_notes)
@@ -241,8 +333,11 @@ class ActionRow(BoxLayout):
         gen_btn = ActButton(text="Generate\nBoard")
         gen_btn.bind(on_press=self.callback_gen)
 
-        solve_btn = ActButton(text="Solve")
-        solve_btn.bind(on_press=self.callback_solve)
+        self.solve_btn = ActButton(text="Solve")
+        self.solve_btn.bind(on_press=self.callback_solve)
+
+        self.cancel_btn = ActButton(text="Cancel", disabled=True)
+        self.cancel_btn.bind(on_press=self.callback_cancel)
 
         reset_btn = ActButton(text="Reset")
         reset_btn.bind(on_press=self.callback_reset)
@@ -251,13 +346,32 @@ class ActionRow(BoxLayout):
         clear_btn.bind(on_press=self.callback_clear)
 
         self.add_widget(toggle_notes_btn)
-        self.add_widget(verify_btn)
+        self.add_widget(self.verify_btn)
         self.add_widget(gen_notes_btn)
         self.add_widget(gen_btn)
-        self.add_widget(solve_btn)
+        self.add_widget(self.solve_btn)
+        self.add_widget(self.cancel_btn)
         self.add_widget(reset_btn)
         self.add_widget(clear_btn)
 
+    def set_busy(self, busy: bool, text: str = "Solving...") -> None:
+        self.verify_btn.disabled = busy
+        self.solve_btn.disabled = busy
+        self.cancel_btn.disabled = not busy
+        self.cancel_btn.text = f"Cancel\n({text})" if busy else "Cancel"
+
+    def run_solve(self, grid: List[List[int]], on_solved: Callable[[List[List[int]]], None], text: str) -> None:
+        def on_done(result: SolveResult) -> None:
+            self.task = None
+            self.set_busy(False)
+            if result.error is not None:
+                print(result.error)
+            else:
+                on_solved(result.grid)
+
+        self.set_busy(True, text)
+        self.task = BackgroundSolve(grid, on_done)
+
     def callback_toggle_notes(self, event) -> None:
         t = 0.7 + 1
         event.background_color = [t - curr for curr in event.background_color]
@@ -266,21 +380,21 @@ class ActionRow(BoxLayout):
                 tile.toggle_notes = tile.toggle_notes ^ True
 
     def callback_verify(self, event) -> None:
-        try:
-            solution = self.board.solution
-            b = Board(self.board.get_grid())
-
-            if solution is None:
-                b_solved = Board(self.board.get_grid())
-                b_solved.solve()
-                solution = b_solved.grid
-
-            incorrect = b.verify_board(solution)
-            if incorrect:
-                for idx, idy in incorrect:
-                    self.board.tiles[idx][idy].background_color = [1, 0.12, 0.12, 1]
-        except (ValueError, RuntimeError) as e:
-            print(e)
+        grid = self.board.get_grid()
+
+        def show_incorrect(solution: List[List[int]]) -> None:
+            try:
+                incorrect = Board(grid).verify_board(solution)
+            except (ValueError, RuntimeError) as e:
+                print(e)
+                return
+            for idx, idy in incorrect or []:
+                self.board.tiles[idx][idy].background_color = [1, 0.12, 0.12, 1]
+
+        if self.board.solution is None:
+            self.run_solve(grid, show_incorrect, "Verifying...")
+        else:
+            show_incorrect(self.board.solution)
 
     def callback_gen_notes(self, event) -> None:
         b = Board(self.board.get_grid())
@@ -288,24 +402,39 @@ class ActionRow(BoxLayout):
         self.notes.set_notes(poss)
 
     def callback_gen(self, event) -> None:
-        grid, solution = BoardGenerator().generate()
-        self.board.solution = solution
-        self.board.set_grid(grid, background_color=[1, 1, 1, 0.8], text_color=[0.3, 0.3, 0.3, 1.0], readonly=True)
-        self.notes.clear_notes()
-
-    def callback_solve(self, event) -> None:
-        try:
-            solution = self.board.solution
+        def show_puzzle(puzzle: Tuple[List[List[int]], List[List[int]]]) -> None:
+            self.task = None
+            self.set_busy(False)
+            grid, solution = puzzle
+            self.board.solution = solution
+            self.board.set_grid(grid, background_color=[1, 1, 1, 0.8], text_color=[0.3, 0.3, 0.3, 1.0],
+                                readonly=True)
+            self.notes.clear_notes()
 
-            if solution is None:
-                b = Board(self.board.get_grid())
-                b.solve()
-                solution = b.grid
+        self.callback_cancel(event)
+        puzzle = self.pool.get(block=False)
+        if puzzle is not None:
+            show_puzzle(puzzle)
+        else:
+            # - The pool has run dry: wait for the refill thread rather than generating on the UI thread
+            self.set_busy(True, "Generating...")
+            self.task = PendingPuzzle(self.pool, show_puzzle)
 
+    def callback_solve(self, event) -> None:
+        def show_solution(solution: List[List[int]]) -> None:
             self.board.set_grid(solution)
             self.notes.clear_notes()
-        except (ValueError, RuntimeError) as e:
-            print(e)
+
+        if self.board.solution is None:
+            self.run_solve(self.board.get_grid(), show_solution, "Solving...")
+        else:
+            show_solution(self.board.solution)
+
+    def callback_cancel(self, event) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.set_busy(False)
 
     def callback_reset(self, event) -> None:
         for idx, row in enumerate(self.board.tiles):
@@ -315,6 +444,7 @@ class ActionRow(BoxLayout):
         self.notes.clear_notes()
 
     def callback_clear(self, event) -> None:
+        self.callback_cancel(event)
         grid = np.full((9, 9), None)
         self.board.set_grid(grid)
         self.board.solution = None
@@ -322,24 +452,30 @@ class ActionRow(BoxLayout):
 
 
 class AllElements(GridLayout):
-    def __init__(self, **kwargs):
+    def __init__(self, pool: PuzzlePool, **kwargs):
         super(AllElements, self).__init__(**kwargs)
         self.cols = 1
         self.rows = 2
 
         overlay = OverlayScreen(size_hint=(1, 0.9))
-        buttons = ActionRow(board=overlay.board, notes=overlay.notes, size_hint=(1, 0.1))
+        buttons = ActionRow(board=overlay.board, notes=overlay.notes, pool=pool, size_hint=(1, 0.1))
 
         self.add_widget(overlay)
         self.add_widget(buttons)
 
+        from kivy.core.window import Window
         Window.size = (600, 600)
 
 
 class SudokuApp(App):
 
     def build(self):
-        return AllElements()
+        # - Puzzles are generated ahead of time in the background, so generating a board never blocks the UI
+        self.pool = PuzzlePool().start()
+        return AllElements(self.pool)
+
+    def on_stop(self):
+        self.pool.stop(timeout=1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+# puzzle_io.py
+import argparse
+import json
+import sys
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, TextIO, Tuple
+from solvedoku import SolveResult, solve_many
+
+# - Characters that stand for an empty tile in an 81-character puzzle line
+BLANKS: str = '.0'
+
+
+def parse_puzzle(line: str) -> List[List[int]]:
+    """Parse a puzzle from the common 81-character format: the tiles in row-major order, with digits for values and
+    '.' or '0' for empty tiles.
+
+    Args:
+        line (str): The puzzle line. Anything after the first 81 characters (e.g. a rating) is ignored.
+
+    Raises:
+        ValueError: If the line is shorter than 81 characters, or contains a character that is not a digit or '.'.
+
+    Returns:
+        List[List[int]]: A 9x9 2D array of integers from 1 through 9, or None for empty tiles.
+    """
+    line = line.strip()
+    if len(line) < 9 * 9:
+        raise ValueError(f"A puzzle needs 81 characters, got {len(line)}.")
+    values: List[int] = []
+    for char in line[:9 * 9]:
+        if char in BLANKS:
+            values.append(None)
+        elif '1' <= char <= '9':
+            values.append(int(char))
+        else:
+            raise ValueError(f"Unexpected character {char!r} in puzzle.")
+    return [values[idx * 9:idx * 9 + 9] for idx in range(0, 9)]
+
+
+def format_grid(grid: List[List[int]]) -> str:
+    """Format a grid in the 81-character format, with '.' for empty tiles.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+    Returns:
+        str: The 81-character line.
+    """
+    return ''.join('.' if col_val is None else str(col_val) for row in grid for col_val in row)
+
+
+def read_puzzles(source: str | TextIO) -> Iterator[List[List[int]] | SolveResult]:
+    """Lazily read puzzles, one per line, from a file. Blank lines and lines starting with '#' are skipped, and a line
+    that is not a valid puzzle does not stop the rest of the file from being read.
+
+    Args:
+        source (str | TextIO): A file path, '-' for stdin, or an open text file
+
+    Yields:
+        List[List[int]] | SolveResult: Each puzzle, in file order, or in place of a line that is not a valid puzzle, a
+            failed SolveResult with a ValueError (the message includes the line number).
+    """
+    if isinstance(source, str):
+        if source == '-':
+            yield from read_puzzles(sys.stdin)
+        else:
+            with open(source) as file:
+                yield from read_puzzles(file)
+        return
+
+    for line_num, line in enumerate(source, start=1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            try:
+                puzzle = parse_puzzle(line)
+            except ValueError as e:
+                yield SolveResult(None, ValueError(f"Line {line_num}: {e}"))
+                continue
+            yield puzzle
+
+
+def solve_stream(puzzles: Iterable[List[List[int]] | SolveResult], workers: int | None = None,
+                 chunksize: int | None = None,
+                 vectorized: bool = False) -> Iterator[Tuple[List[List[int]] | None, SolveResult]]:
+    """Solve a stream of puzzles, pairing each puzzle with its result. Only the puzzles currently being solved are held
+    in memory.
+
+    Args:
+        puzzles (Iterable[List[List[int]] | SolveResult]): The puzzles to solve, and failed results (e.g. from
+            read_puzzles()) that are passed through in their place
+        workers (int | None): The number of worker processes, or None to use one per CPU
+        chunksize (int | None): A fixed number of puzzles to send to a worker at once, or None to size chunks adaptively
+        vectorized (bool): Propagate singles on batches of boards with NumPy before solving the rest one by one
+
+    Yields:
+        Tuple[List[List[int]] | None, SolveResult]: Each puzzle and its result, in input order (with None for the
+            puzzle of a result that was passed through).
+    """
+    in_flight: Deque[List[List[int]] | SolveResult] = deque()
+
+    def track(puzzles: Iterable[List[List[int]] | SolveResult]) -> Iterator[List[List[int]]]:
+        for puzzle in puzzles:
+            in_flight.append(puzzle)
+            if not isinstance(puzzle, SolveResult):
+                yield puzzle
+
+    def passed_through() -> Iterator[Tuple[None, SolveResult]]:
+        # - Results queued before the next puzzle being solved
+        while in_flight and isinstance(in_flight[0], SolveResult):
+            yield (None, in_flight.popleft())
+
+    if vectorized:
+        from vectorized import solve_batch
+        results = solve_batch(track(puzzles), workers=workers or 1)
+    else:
+        results = solve_many(track(puzzles), workers=workers, chunksize=chunksize)
+    for result in results:
+        yield from passed_through()
+        yield (in_flight.popleft(), result)
+    yield from passed_through()
+
+
+def write_results(pairs: Iterable[Tuple[List[List[int]] | None, SolveResult]], out: TextIO, fmt: str = 'lines') -> int:
+    """Write results as they arrive, one line per puzzle.
+
+    Args:
+        pairs (Iterable[Tuple[List[List[int]] | None, SolveResult]]): Each puzzle (None if it could not be read) and
+            its result
+        out (TextIO): The file to write to
+        fmt (str): 'lines' to write each solution in the 81-character format (or 'error: <message>' if the puzzle could
+                   not be solved), or 'jsonl' to write a JSON object with the puzzle, solution, and error
+
+    Raises:
+        ValueError: If fmt is not 'lines' or 'jsonl'.
+
+    Returns:
+        int: The number of puzzles written.
+    """
+    if fmt not in ('lines', 'jsonl'):
+        raise ValueError(f"Unknown output format {fmt!r}, expected 'lines' or 'jsonl'.")
+    count = 0
+    for puzzle, result in pairs:
+        if fmt == 'jsonl':
+            out.write(json.dumps({'puzzle': None if puzzle is None else format_grid(puzzle),
+                                  'solution': None if result.grid is None else format_grid(result.grid),
+                                  'error': None if result.error is None else str(result.error)}) + '\n')
+        elif result.grid is None:
+            out.write(f"error: {result.error}\n")
+        else:
+            out.write(format_grid(result.grid) + '\n')
+        count += 1
+    out.flush()
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Solve puzzles in the 81-character-per-line format.")
+    parser.add_argument('inputs', nargs='*', default=['-'], help="puzzle files ('-' for stdin, the default)")
+    parser.add_argument('-o', '--output', default='-', help="file to write results to ('-' for stdout, the default)")
+    parser.add_argument('-f', '--format', default='lines', choices=['lines', 'jsonl'], help="output format")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('-c', '--chunksize', type=int, default=None, help="puzzles per chunk (default: adaptive)")
+    parser.add_argument('--vectorized', action='store_true', help="propagate singles on batches of boards first")
+    args = parser.parse_args()
+
+    def all_puzzles() -> Iterator[List[List[int]] | SolveResult]:
+        for source in args.inputs:
+            yield from read_puzzles(source)
+
+    pairs = solve_stream(all_puzzles(), workers=args.workers, chunksize=args.chunksize, vectorized=args.vectorized)
+    try:
+        if args.output == '-':
+            write_results(pairs, sys.stdout, args.format)
+        else:
+            with open(args.output, 'w') as out:
+                write_results(pairs, out, args.format)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# puzzle_pool.py
+import queue
+import random
+import sys
+import threading
+from typing import Callable, Dict, List, Tuple
+from solvedoku import DIFFICULTIES, BoardGenerator
+
+# - Difficulty used when none is given, and the number of ready puzzles kept for it by default
+DEFAULT_DIFFICULTY: str = 'any'
+DEFAULT_POOL_SIZE: int = 5
+# - Seconds the refill thread waits before trying again after generating a puzzle failed
+REFILL_RETRY_DELAY: float = 1.0
+
+
+class PuzzlePool:
+    """A bounded queue of ready puzzles per difficulty, refilled by a background thread.
+
+    Taking a puzzle from the pool returns at once when one is ready, and wakes the thread up to replace it. If a queue
+    has run dry, get() either generates the puzzle on the calling thread, without waiting on the refill thread (the two
+    threads then generate at the same time, each with its own generator), or returns None at once so that a caller
+    such as a UI thread can wait for the refill thread without blocking.
+    """
+
+    def __init__(self, sizes: Dict[str, int] | None = None,
+                 generate: Callable[[str], Tuple[List[List[int]], List[List[int]]]] | None = None,
+                 seed: int | None = None) -> None:
+        """Initialize a new, not yet started, puzzle pool
+
+        Args:
+            sizes (Dict[str, int] | None): The number of ready puzzles to keep for each difficulty, or None to keep
+                                           DEFAULT_POOL_SIZE puzzles of DEFAULT_DIFFICULTY
+            generate (Callable[[str], Tuple[List[List[int]], List[List[int]]]] | None): Given a difficulty, will return
+                a (puzzle, solution) pair, or None to use BoardGenerator.generate() (with DIFFICULTIES tiers, and any
+                other difficulty meaning a board of any difficulty). It is called from the refill thread and from
+                get() at the same time, so it must be thread-safe.
+            seed (int | None): Seed for the default generators, or None for random seeds
+
+        Raises:
+            ValueError: If no difficulties are given, or a size is less than 1.
+        """
+        if sizes is None:
+            sizes = {DEFAULT_DIFFICULTY: DEFAULT_POOL_SIZE}
+        if not sizes or any(size < 1 for size in sizes.values()):
+            raise ValueError("A puzzle pool needs at least one difficulty, each with a size of at least 1.")
+        if generate is None:
+            # - One generator per thread, so that the refill thread and get() never share a random number generator
+            generators = threading.local()
+            seeds = random.Random(seed)
+
+            def generate(difficulty: str) -> Tuple[List[List[int]], List[List[int]]]:
+                generator = getattr(generators, 'generator', None)
+                if generator is None:
+                    generator = generators.generator = BoardGenerator(None if seed is None else seeds.getrandbits(64))
+                return generator.generate(difficulty if difficulty in DIFFICULTIES else None)
+        self.generate = generate
+        self.queues: Dict[str, queue.Queue] = {difficulty: queue.Queue(maxsize=size)
+                                               for difficulty, size in sizes.items()}
+        # - Number of puzzles that had to be generated on the calling thread because a queue was empty
+        self.misses: int = 0
+        # - Number of puzzles the refill thread failed to generate
+        self.errors: int = 0
+        # - Guards the counters, which are updated from the calling and refill threads
+        self.__count_lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__stopping = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    def start(self) -> 'PuzzlePool':
+        """Start the background thread that fills the queues, if it is not already running.
+
+        Returns:
+            PuzzlePool: This pool.
+        """
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__stopping.clear()
+            self.__thread = threading.Thread(target=self.__refill, name='PuzzlePool', daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the background thread, after the puzzle it is currently generating (if any).
+
+        Args:
+            timeout (float | None): The maximum number of seconds to wait for the thread, or None to wait until it stops
+        """
+        self.__stopping.set()
+        self.__wake.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            self.__thread = None
+
+    def __enter__(self) -> 'PuzzlePool':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def get(self, difficulty: str = DEFAULT_DIFFICULTY,
+            block: bool = True) -> Tuple[List[List[int]], List[List[int]]] | None:
+        """Take a puzzle from the pool.
+
+        Args:
+            difficulty (str): The difficulty of the puzzle
+            block (bool): If no puzzle is ready, generate one on the calling thread (True), or return None at once and
+                          leave it to the refill thread (False)
+
+        Raises:
+            ValueError: If the pool does not keep puzzles of that difficulty.
+
+        Returns:
+            Tuple[List[List[int]], List[List[int]]] | None: The puzzle and its solution, or None if no puzzle was ready
+                and block is False.
+        """
+        if difficulty not in self.queues:
+            raise ValueError(f"Unknown difficulty {difficulty!r}, expected one of {', '.join(self.queues)}.")
+        self.__wake.set()
+        try:
+            return self.queues[difficulty].get_nowait()
+        except queue.Empty:
+            with self.__count_lock:
+                self.misses += 1
+            return self.generate(difficulty) if block else None
+
+    def ready(self, difficulty: str = DEFAULT_DIFFICULTY) -> int:
+        """Find the number of puzzles of a difficulty that are ready to be taken.
+
+        Args:
+            difficulty (str): The difficulty
+
+        Returns:
+            int: The number of ready puzzles.
+        """
+        return self.queues[difficulty].qsize()
+
+    def __refill(self) -> None:
+        """Keep the queues full until the pool is stopped, always topping up the emptiest queue (relative to its size)
+        first, and sleeping while every queue is full. A puzzle that fails to generate is reported on stderr and retried
+        after REFILL_RETRY_DELAY seconds, rather than ending the thread.
+        """
+        while not self.__stopping.is_set():
+            self.__wake.clear()
+            open_queues = [(que.qsize() / que.maxsize, difficulty) for difficulty, que in self.queues.items()
+                           if not que.full()]
+            if not open_queues:
+                self.__wake.wait()
+                continue
+            difficulty = min(open_queues)[1]
+            try:
+                puzzle = self.generate(difficulty)
+            except Exception as e:
+                with self.__count_lock:
+                    self.errors += 1
+                print(f"PuzzlePool: generating a {difficulty!r} puzzle failed: {e!r}", file=sys.stderr)
+                self.__stopping.wait(REFILL_RETRY_DELAY)
+                continue
+            # - Only this thread adds to the queues, so there is room for the puzzle
+            self.queues[difficulty].put_nowait(puzzle)
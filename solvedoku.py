@@ -1,55 +1,383 @@
 #!/usr/bin/python3
 # solvedoku.py
-import numpy as np
+import functools
 import itertools
-import pickle
+import math
+import os
 import random
-from typing import Tuple, List, Dict
-from test_boards import boards_sols
+import time
+from collections import deque
+from typing import Any, Callable, Tuple, List, Dict, Iterator, Iterable, NamedTuple, Deque, TYPE_CHECKING
+from dlx import sudoku_exact_cover, sudoku_solutions
+if TYPE_CHECKING:
+    import numpy as np
+    from concurrent.futures import Future
+
+# - Candidate bitmasks: bit n is set if the value n + 1 is still possible for a tile
+# - Largest number of values per tile for which each BoardShape precomputes the popcount and lowest bit of every mask,
+# - and the values of every mask (at 16 values the tuples of values alone would take several megabytes). Larger boards
+# - compute them as they are looked up.
+MASK_TABLE_MAX_SIZE: int = 16
+VALUES_TABLE_MAX_SIZE: int = 9
+
+# - solve_many() sizes chunks of puzzles so that each takes about this many seconds to solve in a worker process
+SOLVE_MANY_CHUNK_SECONDS: float = 0.05
+# - Largest number of puzzles that solve_many() sends to a worker process at once
+SOLVE_MANY_MAX_CHUNKSIZE: int = 1024
+# - How hard each technique used by Board.solve() is, from 0 (singles) to 4 (guessing)
+TECHNIQUE_LEVELS: Dict[str, int] = {'row_col': 0, 'block': 0, 'last_possible': 0, 'locked_candidates': 1,
+                                    'naked_groups': 1, 'hidden_groups': 1, 'x_wing': 2, 'swordfish': 3, 'jellyfish': 3,
+                                    'xy_wing': 3, 'last_resort': 4}
+# - Largest naked or hidden group (4 for quads) that Board.solve() looks for in each row, column, and block
+SUBSET_MAX_SIZE: int = 4
+# - Fish techniques used by Board.solve(), by number of lines, smallest first
+FISH_TECHNIQUES: Dict[int, str] = {2: 'x_wing', 3: 'swordfish', 4: 'jellyfish'}
+# - Difficulty tiers, easiest first, each with the hardest technique level that a puzzle in the tier needs
+DIFFICULTIES: Dict[str, int] = {'easy': 0, 'medium': 2, 'hard': 3, 'expert': 4}
+# - Number of candidate puzzles BoardGenerator.generate() digs out for a difficulty before giving up
+GENERATE_MAX_TRIES: int = 500
+# - Number of values the uniqueness check may try before BoardGenerator keeps a value it is digging out. 9x9 checks
+# - take a few dozen; on larger boards this keeps the generator from spending minutes proving a single removal.
+GENERATE_MAX_NODES: int = 100
+# - Dead ends per tile after which BoardGenerator.generate_filled() starts over. Fills that get this stuck tend to stay
+# - stuck: past this point, a 25x25 fill can take minutes, while starting over finishes in well under a second.
+FILL_MAX_DEAD_ENDS: float = 0.25
+
+
+class _ComputedTable:
+    """Stands in for a table indexed by bitmask where the table would be too large, computing each entry on lookup"""
+
+    def __init__(self, func: Callable[[int], Any]) -> None:
+        """Initialize a new computed table
+
+        Args:
+            func (Callable[[int], Any]): Given a bitmask, will return its entry
+        """
+        self.func = func
+
+    def __getitem__(self, mask: int) -> Any:
+        return self.func(mask)
+
+
+class BoardShape:
+    """The dimensions and bitmask tables of boards of one order. A board of order n is made of n x n blocks of n x n
+    tiles, so it has n^2 rows, columns, and blocks, and holds the values 1 through n^2 (order 3 is the usual 9x9 board).
+    Shapes are cached, so get one with BoardShape.of() rather than creating it."""
+
+    def __init__(self, order: int) -> None:
+        """Initialize a new BoardShape
+
+        Args:
+            order (int): The board order, at least 2
+
+        Raises:
+            ValueError: If order is less than 2.
+        """
+        if order < 2:
+            raise ValueError(f"A board order must be at least 2, got {order}.")
+        self.order: int = order
+        # - Number of rows, columns, blocks, and values, and the number of tiles
+        self.size: int = order * order
+        self.num_cells: int = self.size * self.size
+        # - Bitmask with every value set
+        self.all_values: int = (1 << self.size) - 1
+        # - Number of set bits, index of the lowest set bit (-1 for an empty mask), and indices of the set bits (values
+        # - from 0 through size - 1) of every mask
+        self.popcount: List[int] | _ComputedTable
+        self.lowbit: List[int] | _ComputedTable
+        self.mask_values: List[Tuple[int, ...]] | _ComputedTable
+        if self.size <= MASK_TABLE_MAX_SIZE:
+            self.popcount = [mask.bit_count() for mask in range(0, 1 << self.size)]
+            self.lowbit = [(mask & -mask).bit_length() - 1 for mask in range(0, 1 << self.size)]
+        else:
+            self.popcount = _ComputedTable(int.bit_count)
+            self.lowbit = _ComputedTable(lambda mask: (mask & -mask).bit_length() - 1)
+        if self.size <= VALUES_TABLE_MAX_SIZE:
+            self.mask_values = [BoardShape.__values(mask) for mask in range(0, 1 << self.size)]
+        else:
+            self.mask_values = _ComputedTable(BoardShape.__values)
+        # - (row index, column index, block number) of each tile, in row-major order
+        self.cell_units: List[Tuple[int, int, int]] = [(idx, idy, idx // order * order + idy // order)
+                                                       for idx in range(0, self.size) for idy in range(0, self.size)]
+        # - Tiles of each unit: the rows, then the columns, then the blocks
+        size, num_cells = self.size, self.num_cells
+        self.unit_cells: List[Tuple[int, ...]] = \
+            [tuple(range(idx * size, idx * size + size)) for idx in range(0, size)] + \
+            [tuple(range(idy, num_cells, size)) for idy in range(0, size)] + \
+            [tuple(cell for cell, units in enumerate(self.cell_units) if units[2] == block_num)
+             for block_num in range(0, size)]
+        self.row_cells: List[Tuple[int, ...]] = self.unit_cells[:size]
+        self.col_cells: List[Tuple[int, ...]] = self.unit_cells[size:2 * size]
+        self.block_cells: List[Tuple[int, ...]] = self.unit_cells[2 * size:]
+        # - Bitmasks of the positions within a unit (bit n for the unit's nth tile) of each run of 'order' tiles: a row
+        # - or column's segments, one for each block it crosses, are also a block's rows, and a block's columns are
+        # - its stripes
+        self.segment_masks: List[int] = [((1 << order) - 1) << (seg * order) for seg in range(0, order)]
+        self.stripe_masks: List[int] = [sum(1 << (pos * order + seg) for pos in range(0, order))
+                                        for seg in range(0, order)]
+        # - Bitmask of the units each tile is in (bit n for unit n of unit_cells)
+        self.unit_bits: List[int] = [1 << idx | 1 << (size + idy) | 1 << (2 * size + block_num)
+                                     for idx, idy, block_num in self.cell_units]
+        # - Other tiles in the same row, column, or block as each tile, as sorted tuples to iterate over and as sets to
+        # - test whether two tiles see each other
+        self.peer_sets: List[frozenset] = [
+            frozenset(self.row_cells[idx] + self.col_cells[idy] + self.block_cells[block_num]) - {cell}
+            for cell, (idx, idy, block_num) in enumerate(self.cell_units)]
+        self.peers: List[Tuple[int, ...]] = [tuple(sorted(peer_set)) for peer_set in self.peer_sets]
+
+    @staticmethod
+    def __values(mask: int) -> Tuple[int, ...]:
+        """Find the indices of the set bits of a bitmask.
+
+        Args:
+            mask (int): The bitmask
+
+        Returns:
+            Tuple[int, ...]: The indices of the set bits, lowest first.
+        """
+        values: List[int] = []
+        while mask:
+            bit = mask & -mask
+            values.append(bit.bit_length() - 1)
+            mask ^= bit
+        return tuple(values)
+
+    @staticmethod
+    @functools.cache
+    def of(order: int) -> 'BoardShape':
+        """Get the shape of boards of an order, building it the first time it is needed.
+
+        Args:
+            order (int): The board order, at least 2
+
+        Raises:
+            ValueError: If order is less than 2.
+
+        Returns:
+            BoardShape: The shape.
+        """
+        return BoardShape(order)
+
+    @staticmethod
+    def of_grid(grid: List[List[int]]) -> 'BoardShape':
+        """Get the shape of boards the size of a grid.
+
+        Args:
+            grid (List[List[int]]): A 2D array with a row for each row of the board
+
+        Raises:
+            TypeError: If the number of rows is not the square of an order of at least 2.
+
+        Returns:
+            BoardShape: The shape.
+        """
+        order = math.isqrt(len(grid)) if isinstance(grid, list) else 0
+        if order < 2 or order * order != len(grid):
+            raise TypeError("The given value for 'arr' is not an n^2 x n^2 list of integers.")
+        return BoardShape.of(order)
+
+    # - Shapes are shared, so copies and pickles refer to the cached shape of the same order
+    def __copy__(self) -> 'BoardShape':
+        return self
+
+    def __deepcopy__(self, memo: dict) -> 'BoardShape':
+        return self
+
+    def __reduce__(self) -> tuple:
+        return (BoardShape.of, (self.order,))
+
+
+class SolveStats:
+    """Per-technique statistics collected by Board.solve(). Collecting them is opt-in: pass a SolveStats to
+    Board.solve(), and the same object can be passed to several solves to add their statistics together."""
+
+    def __init__(self) -> None:
+        """Initialize a new, empty set of statistics"""
+        # - Number of calls, seconds spent (excluding techniques called from within), possibilities eliminated, and
+        # - tiles set, by technique
+        self.calls: Dict[str, int] = {}
+        self.time: Dict[str, float] = {}
+        self.eliminated: Dict[str, int] = {}
+        self.placed: Dict[str, int] = {}
+        # - Number of rounds of the propagation engine of Board.solve() (a round lasts while setting singles has work)
+        self.iterations: int = 0
+        # - Number of values tried by the last resort, and how deeply the tries were nested
+        self.guesses: int = 0
+        self.guess_depth: int = 0
+        self.max_guess_depth: int = 0
+        # - Techniques currently running, innermost last, as [technique, start time, time spent in nested techniques]
+        self.__running: List[List[Any]] = []
+
+    def start(self, technique: str) -> None:
+        """Start timing a call of a technique.
+
+        Args:
+            technique (str): The name of the technique
+        """
+        self.calls[technique] = self.calls.get(technique, 0) + 1
+        self.__running.append([technique, time.perf_counter(), 0.0])
+
+    def stop(self) -> None:
+        """Stop timing the innermost running technique."""
+        technique, start, nested = self.__running.pop()
+        elapsed = time.perf_counter() - start
+        self.time[technique] = self.time.get(technique, 0.0) + elapsed - nested
+        if self.__running:
+            self.__running[-1][2] += elapsed
+
+    def timed(self, technique: str, method: Callable) -> Callable:
+        """Wrap a technique's method so that each call is counted and timed.
+
+        Args:
+            technique (str): The name of the technique
+            method (Callable): The method to wrap
+
+        Returns:
+            Callable: The wrapped method.
+        """
+        def run(*args):
+            self.start(technique)
+            try:
+                return method(*args)
+            finally:
+                self.stop()
+        return run
+
+    @property
+    def current(self) -> str | None:
+        """The innermost running technique, or None."""
+        return self.__running[-1][0] if self.__running else None
+
+    def add_eliminated(self, technique: str | None, count: int) -> None:
+        """Record possibilities eliminated by a technique.
+
+        Args:
+            technique (str | None): The name of the technique, or None for eliminations outside of any technique
+            count (int): The number of possibilities eliminated
+        """
+        technique = technique or 'other'
+        self.eliminated[technique] = self.eliminated.get(technique, 0) + count
+
+    def add_placed(self, technique: str, count: int = 1) -> None:
+        """Record tiles set by a technique.
+
+        Args:
+            technique (str): The name of the technique
+            count (int): The number of tiles set
+        """
+        self.placed[technique] = self.placed.get(technique, 0) + count
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Convert the statistics to plain data (e.g. to save them as JSON).
+
+        Returns:
+            Dict[str, Any]: The statistics, with a dict of calls, time, eliminated, and placed for each technique.
+        """
+        techniques = sorted(set(self.calls) | set(self.eliminated) | set(self.placed))
+        return {
+            'iterations': self.iterations,
+            'guesses': self.guesses,
+            'max_guess_depth': self.max_guess_depth,
+            'techniques': {technique: {'calls': self.calls.get(technique, 0),
+                                       'time_s': self.time.get(technique, 0.0),
+                                       'eliminated': self.eliminated.get(technique, 0),
+                                       'placed': self.placed.get(technique, 0)} for technique in techniques},
+        }
+
+    def __repr__(self) -> str:
+        """Represent the statistics as a table with a row for each technique.
+
+        Returns:
+            str: The string representation of the statistics.
+        """
+        data = self.as_dict()
+        s = f"{'technique':<16}{'calls':>9}{'ms':>11}{'eliminated':>12}{'placed':>9}\n"
+        for technique, row in data['techniques'].items():
+            s += f"{technique:<16}{row['calls']:>9}{row['time_s'] * 1000:>11.2f}{row['eliminated']:>12}" + \
+                f"{row['placed']:>9}\n"
+        s += f"iterations: {self.iterations}, guesses: {self.guesses}, max guess depth: {self.max_guess_depth}"
+        return s
+
+
+class Grade(NamedTuple):
+    """How hard a puzzle is to solve with Board.solve(). Grades sort from easiest to hardest."""
+    # - TECHNIQUE_LEVELS level of the hardest technique used
+    level: int
+    # - Number of rounds of the propagation engine of Board.solve()
+    steps: int
+    # - How deeply the last resort's tries were nested
+    max_guess_depth: int
+    # - The hardest technique used, and the difficulty tier it falls in
+    hardest: str
+    difficulty: str
 
 
 class Board:
     """Represents a Sudoku board"""
 
-    def __init__(self, grid: List[List[int]]) -> None:
+    def __init__(self, grid: List[List[int]], order: int | None = None) -> None:
         """Initialize a new Board
 
         Args:
-            grid (List[List]): A 9x9 2D array of integers from 1 through 9
+            grid (List[List]): A 9x9 2D array of integers from 1 through 9 (or an n^2 x n^2 array of integers from 1
+                               through n^2 for a board of order n)
+            order (int | None): The board order (3 for a 9x9 board, 4 for 16x16, 5 for 25x25), or None to take it from
+                                the size of the grid
 
         Raises:
-            TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through 9
+            TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through n^2
         """
         # - Verify grid
+        shape = BoardShape.of_grid(grid) if order is None else BoardShape.of(order)
+        size = shape.size
         correct = True
         if not isinstance(grid, list):
             correct = False
-        elif len(grid) == 9:
+        elif len(grid) == size:
             for row in grid:
-                if not isinstance(row, list) or len(row) != 9:
+                if not isinstance(row, list) or len(row) != size:
                     correct = False
+                    continue
                 for col_val in row:
-                    if not (isinstance(col_val, type(None)) or (isinstance(col_val, int) and col_val in range(1, 10))):
+                    if not (isinstance(col_val, type(None)) or
+                            (isinstance(col_val, int) and col_val in range(1, size + 1))):
                         correct = False
         else:
             correct = False
         if not correct:
             raise TypeError(
-                "The given value for 'arr' is not a 9x9 list of integers.")
+                f"The given value for 'arr' is not a {size}x{size} list of integers.")
+
+        # - Dimensions and bitmask tables of the Board's order
+        self.shape: BoardShape = shape
+        self.order: int = shape.order
 
         # - Original grid, will not be changed through solving
-        self.grid_orig: List[List] = np.array(grid).tolist()
+        self.grid_orig: List[List] = [list(row) for row in grid]
         # - Grid, will be changed through solving
-        self.grid: List[List] = np.array(grid).tolist()
+        self.grid: List[List] = [list(row) for row in grid]
         # - Number of unsolved tiles
-        self.unsolved: int = 9 * 9
-        # - Lists of possibile integers for each tile in the Board
-        self.poss: List[List[List[int]]] = np.full((9, 9, 9), np.arange(0, 9)).tolist()
-        # - Lists of true/false based on what values are contained in rows, columns, and blocks
-        self.row_has: List[List[bool]]
-        self.col_has: List[List[bool]]
-        self.block_has: List[List[bool]]
+        self.unsolved: int = shape.num_cells
+        # - Bitmask of possible values for each tile in the Board, indexed by idx * size + idy (0 once a tile is solved)
+        self.cands: List[int] = [shape.all_values] * shape.num_cells
+        # - Bitmasks of what values are contained in rows, columns, and blocks
+        self.row_has: List[int]
+        self.col_has: List[int]
+        self.block_has: List[int]
+        # - False if a given value repeats in a row, column, or block
+        self.valid: bool = True
         self.row_has, self.col_has, self.block_has = self.__gen_row_col_block()
+        # - Statistics being collected by self.solve(), if any
+        self.__stats: SolveStats | None = None
+        # - Undo log of every change made while the last resort is trying values, or None when not trying values.
+        # - Entries are (tile index, previous candidate bitmask) for a changed bitmask, or (-1 - tile index, value)
+        # - for a set tile.
+        self.__trail: List[Tuple[int, int]] | None = None
+        # - Work for the propagation engine of self.solve(): bitmasks of the units and values whose possibilities have
+        # - changed since it last looked, and tiles that eliminations left with a single possibility
+        self.__changed_units: int = 0
+        self.__changed_values: int = 0
+        self.__singles: List[int] = []
 
     def __repr__(self) -> str:
         """Represent a board by separating each block with bars,
@@ -59,18 +387,21 @@ class Board:
         Returns:
             str: The string representation of a Board.
         """
-        rbar = '--' * 9 + '-' * (4 * 2 - 1) + '\n'
+        order, size = self.order, self.shape.size
+        # - Values are right-aligned to the width of the largest value
+        width = len(str(size))
+        rbar = '-' * (order * (order * (width + 1) + 2) + 1) + '\n'
         s = ''
         for idx, row in enumerate(self.grid):
-            if idx % 3 == 0:
+            if idx % order == 0:
                 s += rbar
             for idy, col_val in enumerate(row):
-                if idy % 3 == 0:
+                if idy % order == 0:
                     s += '| '
                 if isinstance(col_val, type(None)):
-                    s += '- '
+                    s += '-'.rjust(width) + ' '
                 else:
-                    s += str(col_val) + ' '
+                    s += str(col_val).rjust(width) + ' '
                 if idy == len(row) - 1:
                     s += '|'
             s += '\n'
@@ -85,6 +416,17 @@ class Board:
         """
         return self.__repr__()
 
+    @property
+    def poss(self) -> List[List[List[int]]]:
+        """The lists of possible values (from 0 through 8) for each tile in the Board, built from the candidate
+        bitmasks.
+
+        Returns:
+            List[List[List[int]]]: A 9x9 2D array of lists of possible values.
+        """
+        mask_values, size = self.shape.mask_values, self.shape.size
+        return [[list(mask_values[self.cands[idx * size + idy]]) for idy in range(0, size)] for idx in range(0, size)]
+
     def poss_tostring(self) -> str:
         """Create a string with the current possibilities/notes with appropriate spacing (by row and column).
 
@@ -92,15 +434,16 @@ class Board:
             str: The current possibilities/notes as a pretty string.
         """
         poss_str = ""
+        poss = self.poss
 
         col_lengths: List[int] = []
-        for col_num in range(0, 9):
+        for col_num in range(0, self.shape.size):
             col_max_len = 0
-            for row_num in range(0, 9):
-                col_max_len = max(col_max_len, len(self.poss[row_num][col_num]))
+            for row_num in range(0, self.shape.size):
+                col_max_len = max(col_max_len, len(poss[row_num][col_num]))
             col_lengths.append(col_max_len)
 
-        for row in self.poss:
+        for row in poss:
             for idy, col_val in enumerate(row):
                 spaces_to_add = (col_lengths[idy] - len(col_val)) * 3
                 if len(col_val) != 0:
@@ -116,633 +459,712 @@ class Board:
             other_board (Board): The Board whose values to copy over.
         """
         try:
+            self.shape = other_board.shape
+            self.order = other_board.order
             self.grid_orig = other_board.grid_orig
             self.grid = other_board.grid
             self.unsolved = other_board.unsolved
-            self.poss = other_board.poss
+            self.cands = other_board.cands
             self.row_has = other_board.row_has
             self.col_has = other_board.col_has
             self.block_has = other_board.block_has
+            self.valid = other_board.valid
         except AttributeError:
             return
 
     @staticmethod
-    def get_block_num(idx: int, idy: int) -> int | None:
-        """Given a row and column index, will return the block number.
+    def get_block_num(idx: int, idy: int, order: int = 3) -> int | None:
+        """Given a row and column index, will return the block number. Blocks are numbered in row-major order, e.g. for
+        a 9x9 board:
 
         0 1 2
         3 4 5
         6 7 8
 
         Args:
-            idx (int): row index from 0 through 8
-            idy (int): column index from 0 through 8
+            idx (int): row index from 0 through 8 (through n^2 - 1 for a board of order n)
+            idy (int): column index from 0 through 8 (through n^2 - 1 for a board of order n)
+            order (int): The board order
 
         Returns:
             int | None: The block number between from 0 through 8, or None if the indices are not within the correct
                         dimensions.
         """
-        r0, r1, r2 = range(0, 3), range(3, 6), range(6, 9)
-        if idx in r0 and idy in r0:
-            return 0
-        elif idx in r0 and idy in r1:
-            return 1
-        elif idx in r0 and idy in r2:
-            return 2
-        elif idx in r1 and idy in r0:
-            return 3
-        elif idx in r1 and idy in r1:
-            return 4
-        elif idx in r1 and idy in r2:
-            return 5
-        elif idx in r2 and idy in r0:
-            return 6
-        elif idx in r2 and idy in r1:
-            return 7
-        elif idx in r2 and idy in r2:
-            return 8
-        else:
+        size = order * order
+        if not (0 <= idx < size and 0 <= idy < size):
             return None
+        return idx // order * order + idy // order
 
     @staticmethod
-    def get_block_range(block_num: int) -> Tuple[range, range] | None:
+    def get_block_range(block_num: int, order: int = 3) -> Tuple[range, range] | None:
         """Given a block number, will return the ranges for the row and column indices.
 
         Args:
-            block_num (int): The block number from 0 through 8
+            block_num (int): The block number from 0 through 8 (through n^2 - 1 for a board of order n)
+            order (int): The board order
 
         Returns:
             Tuple[range, range] | None: A tuple where the first value is the row index range and the second value is
                                         the column index range.
         """
-        r0, r1, r2 = range(0, 3), range(3, 6), range(6, 9)
-        if block_num == 0:
-            return (r0, r0)
-        elif block_num == 1:
-            return (r0, r1)
-        elif block_num == 2:
-            return (r0, r2)
-        elif block_num == 3:
-            return (r1, r0)
-        elif block_num == 4:
-            return (r1, r1)
-        elif block_num == 5:
-            return (r1, r2)
-        elif block_num == 6:
-            return (r2, r0)
-        elif block_num == 7:
-            return (r2, r1)
-        elif block_num == 8:
-            return (r2, r2)
-        else:
+        if not 0 <= block_num < order * order:
             return None
+        first_row, first_col = block_num // order * order, block_num % order * order
+        return (range(first_row, first_row + order), range(first_col, first_col + order))
 
-    def __gen_row_col_block(self) -> Tuple[List[List[bool]], List[List[bool]], List[List[bool]]]:
-        """Generate the lists of what each row, column, and block contain.
+    def __gen_row_col_block(self) -> Tuple[List[int], List[int], List[int]]:
+        """Generate the bitmasks of what each row, column, and block contain, marking the Board as not valid if a value
+        repeats in any of them.
 
         Returns:
-            Tuple[List[List[bool]], List[List[bool]], List[List[bool]]]: A tuple of lists of what each row, column, and
-                block (respectively) contain, represented by a boolean for each value.
+            Tuple[List[int], List[int], List[int]]: A tuple of lists of what each row, column, and block
+                (respectively) contain, represented by a bitmask of the contained values.
         """
-        row_has: List[List[bool]] = np.full((9, 9), False)
-        col_has: List[List[bool]] = np.full((9, 9), False)
-        block_has: List[List[bool]] = np.full((9, 9), False)
-        for idx, row in enumerate(self.grid):
-            for idy, col_val in enumerate(row):
-                if not isinstance(col_val, type(None)):
-                    idc = col_val - 1
-                    row_has[idx][idc] = True
-                    col_has[idy][idc] = True
-                    block_has[Board.get_block_num(idx, idy)][idc] = True
-                    self.poss[idx][idy] = []
-                    self.unsolved -= 1
+        size, cell_units = self.shape.size, self.shape.cell_units
+        row_has: List[int] = [0] * size
+        col_has: List[int] = [0] * size
+        block_has: List[int] = [0] * size
+        for cell, col_val in enumerate(itertools.chain.from_iterable(self.grid)):
+            if not isinstance(col_val, type(None)):
+                idx, idy, block_num = cell_units[cell]
+                bit = 1 << (col_val - 1)
+                if (row_has[idx] | col_has[idy] | block_has[block_num]) & bit:
+                    self.valid = False
+                row_has[idx] |= bit
+                col_has[idy] |= bit
+                block_has[block_num] |= bit
+                self.cands[cell] = 0
+                self.unsolved -= 1
         return (row_has, col_has, block_has)
 
-    def gen_poss(self, curr_poss: List[List[List[int]]]) -> List[List[List[int]]]:
+    def __gen_cands(self) -> None:
+        """Remove the values contained in each tile's row, column, and block from the tile's candidate bitmask."""
+        cands = self.cands
+        trail = self.__trail
+        row_has, col_has, block_has, cell_units = self.row_has, self.col_has, self.block_has, self.shape.cell_units
+        for cell, col_val in enumerate(itertools.chain.from_iterable(self.grid)):
+            old = cands[cell]
+            if col_val is None:
+                idx, idy, block_num = cell_units[cell]
+                new = old & ~(row_has[idx] | col_has[idy] | block_has[block_num])
+            else:
+                new = 0
+            if new != old:
+                if trail is not None:
+                    trail.append((cell, old))
+                cands[cell] = new
+
+    def gen_poss(self, curr_poss: List[List[List[int]]] | None = None) -> List[List[List[int]]]:
         """Find the list of possibilities for each tile in the Board. This is similar to notes when solving by hand.
 
         Args:
-            curr_poss (List[List[List[int]]]): The current list of possibilities for each tile.
+            curr_poss (List[List[List[int]]] | None): The current list of possibilities for each tile, or None to
+                                                      start from the Board's own candidates.
 
         Returns:
             List[List[List[int]]]: The new list of possibilities for each tile.
         """
-        for idx, row in enumerate(self.grid):
-            for idy, col_val in enumerate(row):
-                new_poss = []
-                if col_val is None:
-                    for poss_val in curr_poss[idx][idy]:
-                        if not self.row_has[idx][poss_val] and not self.col_has[idy][poss_val] and \
-                                not self.block_has[Board.get_block_num(idx, idy)][poss_val]:
-                            new_poss.append(poss_val)
-                curr_poss[idx][idy] = new_poss
-        return curr_poss
+        if curr_poss is not None:
+            size = self.shape.size
+            self.cands = [sum(1 << val for val in curr_poss[idx][idy]) for idx in range(0, size)
+                          for idy in range(0, size)]
+        self.__gen_cands()
+        return self.poss
+
+    def __eliminate(self, cell: int, mask: int) -> bool:
+        """Remove the values in a bitmask from the possibilities of a tile, and mark the tile's units and the removed
+        values as changed for the propagation engine.
+
+        Args:
+            cell (int): The tile's index (row index * size + column index)
+            mask (int): Bitmask of the values to remove
+
+        Raises:
+            ValueError: If the tile is left with no possibilities.
+
+        Returns:
+            bool: True if at least one possibility was removed.
+        """
+        cands = self.cands[cell]
+        removed = cands & mask
+        if removed:
+            if self.__trail is not None:
+                self.__trail.append((cell, cands))
+            cands ^= removed
+            self.cands[cell] = cands
+            self.__changed_units |= self.shape.unit_bits[cell]
+            self.__changed_values |= removed
+            if self.__stats is not None:
+                self.__stats.add_eliminated(self.__stats.current, self.shape.popcount[removed])
+            if not cands:
+                raise ValueError("The given board is invalid (there is no valid solution).")
+            if self.shape.popcount[cands] == 1:
+                self.__singles.append(cell)
+            return True
+        return False
+
+    def __set_tile(self, idx: int, idy: int, val: int) -> Tuple[List[int], List[int]]:
+        """Set the tile at the given indices to the given value, and remove the value from the possibilities of the
+        tile's peers (the other tiles in its row, column, and block). Peers that are left with a single possibility are
+        set in turn, through a propagation queue. The units and values of every changed tile are marked as changed for
+        the propagation engine.
+
+        Args:
+            idx (int): row index from 0 through 8
+            idy (int): column index from 0 through 8
+            val (int): value to set the tile to
+
+        Returns:
+            Tuple[List[int], List[int]]: A tuple of the tiles (indices into the candidate bitmasks) that were set
+                because they were left with a single possibility, and the tiles that were left with no possibilities
+                (contradictions). Propagation stops at the first contradiction.
+        """
+        singles: List[int] = []
+        contradictions: List[int] = []
+        queue: List[int] = []
+        cands = self.cands
+        trail = self.__trail
+        popcount, lowbit, cell_units, peers, unit_bits = self.shape.popcount, self.shape.lowbit, \
+            self.shape.cell_units, self.shape.peers, self.shape.unit_bits
+        changed_units, changed_values = 0, 0
+        cell = idx * self.shape.size + idy
+        while True:
+            bit = 1 << val
+            idx, idy, block_num = cell_units[cell]
+            self.grid[idx][idy] = val + 1
+            self.row_has[idx] |= bit
+            self.col_has[idy] |= bit
+            self.block_has[block_num] |= bit
+            if trail is not None:
+                trail.append((-1 - cell, val))
+                trail.append((cell, cands[cell]))
+            changed_units |= unit_bits[cell]
+            changed_values |= cands[cell] | bit
+            cands[cell] = 0
+            self.unsolved -= 1
+
+            # - Remove the value from the tile's peers
+            for peer in peers[cell]:
+                peer_cands = cands[peer]
+                if peer_cands & bit:
+                    if trail is not None:
+                        trail.append((peer, peer_cands))
+                    peer_cands &= ~bit
+                    cands[peer] = peer_cands
+                    changed_units |= unit_bits[peer]
+                    if not peer_cands:
+                        contradictions.append(peer)
+                    elif popcount[peer_cands] == 1:
+                        queue.append(peer)
+            if contradictions:
+                break
+
+            # - Set the next queued tile that still has a single possibility
+            while queue:
+                cell = queue.pop()
+                if popcount[cands[cell]] == 1:
+                    break
+            else:
+                break
+            singles.append(cell)
+            val = lowbit[cands[cell]]
+        self.__changed_units |= changed_units
+        self.__changed_values |= changed_values
+        return (singles, contradictions)
 
-    def __set_tile(self, idx: int, idy: int, val: int):
-        """Set the tile at the given indices to the given value.
+    def __place(self, idx: int, idy: int, val: int, technique: str) -> None:
+        """Set a tile while solving, and stop solving as soon as the placement leads to a contradiction.
 
         Args:
             idx (int): row index from 0 through 8
             idy (int): column index from 0 through 8
             val (int): value to set the tile to
+            technique (str): The name of the technique that found the value, for the solve statistics
+
+        Raises:
+            ValueError: If the placement leaves a tile with no possibilities.
         """
-        self.grid[idx][idy] = val + 1
-        self.row_has[idx][val] = True
-        self.col_has[idy][val] = True
-        self.block_has[Board.get_block_num(idx, idy)][val] = True
-        self.poss = self.gen_poss(self.poss)
-        self.unsolved -= 1
+        singles, contradictions = self.__set_tile(idx, idy, val)
+        if self.__stats is not None:
+            self.__stats.add_placed(technique)
+            if singles:
+                self.__stats.add_placed('last_possible', len(singles))
+        if contradictions:
+            raise ValueError("The given board is invalid (there is no valid solution).")
 
-    def solve(self) -> None:
+    def __rollback(self, checkpoint: int) -> None:
+        """Undo every change recorded in the trail since a checkpoint, most recent first. Checkpoints are only taken
+        once the propagation engine has run out of work, so the work it was given since is dropped as well.
+
+        Args:
+            checkpoint (int): The length of the trail when the checkpoint was taken
+        """
+        trail = self.__trail
+        self.__changed_units, self.__changed_values = 0, 0
+        self.__singles.clear()
+        while len(trail) > checkpoint:
+            key, old = trail.pop()
+            if key >= 0:
+                self.cands[key] = old
+            else:
+                idx, idy, block_num = self.shape.cell_units[-1 - key]
+                mask = ~(1 << old)
+                self.grid[idx][idy] = None
+                self.row_has[idx] &= mask
+                self.col_has[idy] &= mask
+                self.block_has[block_num] &= mask
+                self.unsolved += 1
+
+    def solve(self, stats: SolveStats | None = None) -> None:
         """Find a solution for the Board.
 
+        Args:
+            stats (SolveStats | None): Statistics to record the calls, time, eliminations, and placements of each
+                                       technique in, or None to not collect any
+
         Raises:
             ValueError: If the Board is unsolveable.
             RuntimeError: If the Board is invalid.
         """
-        stuck: int = self.unsolved
+        self.__stats = stats
+        if not self.valid:
+            raise ValueError("The given board is invalid (a value repeats in a row, column, or block).")
+        self.__gen_cands()
+        if any(not cands for cands, col_val in zip(self.cands, itertools.chain.from_iterable(self.grid))
+               if col_val is None):
+            raise ValueError("The given board is invalid (there is no valid solution).")
+        # - Every unit and value starts out changed, and every tile with a single possibility is waiting to be set
+        self.__changed_units = (1 << len(self.shape.unit_cells)) - 1
+        self.__changed_values = self.shape.all_values
+        self.__singles = [cell for cell, cands in enumerate(self.cands) if self.shape.popcount[cands] == 1]
+        self.__propagate()
+
+    def __propagate(self) -> None:
+        """Solve the Board with a propagation engine. Every change to a tile's possibilities marks its units and the
+        removed values as changed. Techniques are only run on units (or, for fish, values) that changed since they
+        last looked, always running the cheapest technique that has work waiting:
+
+        1. Setting tiles that have a single possibility left (last_possible)
+        2. Hidden singles in changed rows, columns (row_col), and blocks (block)
+        3. Locked candidates in changed rows, columns, and blocks (locked_candidates)
+        4. Naked groups (naked_groups) and hidden groups (hidden_groups) in changed rows, columns, and blocks
+        5. Fish for changed values: X Wings (x_wing), then Swordfish (swordfish), then Jellyfish (jellyfish)
+        6. Once nothing is changing: XY Wings, then the last resort
+
+        Called by self.solve(), and by the last resort to continue after setting a value it is trying.
+
+        Raises:
+            ValueError: If the Board is unsolveable.
+            RuntimeError: If the Board is invalid.
+        """
+        stats = self.__stats
+        solve_locked_candidates, solve_naked_groups, solve_hidden_groups, solve_last_possible, solve_xy_wing, \
+            solve_last_resort = self.__solve_locked_candidates, self.__solve_naked_groups, self.__solve_hidden_groups, \
+            self.__solve_last_possible, self.__solve_xy_wing, self.__solve_last_resort
+        solve_line_singles = solve_block_singles = self.__solve_hidden_singles
+        solve_fishes: List[Tuple[int, Callable]] = [(fish_size, self.__solve_fish) for fish_size in FISH_TECHNIQUES]
+        if stats is not None:
+            solve_fishes = [(fish_size, stats.timed(technique, self.__solve_fish))
+                            for fish_size, technique in FISH_TECHNIQUES.items()]
+            solve_naked_groups = stats.timed('naked_groups', solve_naked_groups)
+            solve_hidden_groups = stats.timed('hidden_groups', solve_hidden_groups)
+            solve_locked_candidates = stats.timed('locked_candidates', solve_locked_candidates)
+            solve_last_possible = stats.timed('last_possible', solve_last_possible)
+            solve_xy_wing = stats.timed('xy_wing', solve_xy_wing)
+            solve_last_resort = stats.timed('last_resort', solve_last_resort)
+            solve_line_singles = stats.timed('row_col', solve_line_singles)
+            solve_block_singles = stats.timed('block', solve_block_singles)
+
+        size = self.shape.size
+        # - Bitmasks of the units waiting for hidden singles, locked candidates, and groups, and of the values waiting
+        # - for fish
+        singles_units, locked_units, groups_units, fish_values = 0, 0, 0, 0
+        in_round = False
         tried_xy_wing = False
         tried_last_resort = False
         while self.unsolved > 0:
-            self.poss = self.gen_poss(self.poss)
-            # - Solve by rows
-            for idx, r_has in enumerate(self.row_has):
-                for val in range(0, 9):
-                    found = self.__solve_row_col(0, idx, r_has, val)
-                    if found:
-                        self.__set_tile(idx=idx, idy=found, val=val)
-            # - Solve by columns
-            for idy, c_has in enumerate(self.col_has):
-                for val in range(0, 9):
-                    found = self.__solve_row_col(1, idy, c_has, val)
-                    if found:
-                        self.__set_tile(idx=found, idy=idy, val=val)
-            # - Solve by blocks
-            for block_num in range(0, 9):
-                self.__solve_hidden_groups(block_num)
-                for val in range(0, 9):
-                    found = self.__solve_block(block_num, val)
-                    if found:
-                        self.__set_tile(idx=found[0], idy=found[1], val=val)
-            # - Set sells that only have one remaining possibility
-            self.__solve_last_possible()
-            # - Check if we have reached a stuck state and run higher cost algorithms
-            if self.unsolved == stuck and not self.__has_rem_poss():
-                raise ValueError("The given board is invalid (there is no valid solution).")
-            if self.unsolved == stuck and not tried_xy_wing:
-                self.__solve_xy_wing()
+            # - Hand out the units and values changed by the last technique
+            if self.__changed_units or self.__changed_values:
+                singles_units |= self.__changed_units
+                locked_units |= self.__changed_units
+                groups_units |= self.__changed_units
+                fish_values |= self.__changed_values
+                self.__changed_units, self.__changed_values = 0, 0
+                tried_xy_wing = False
+                tried_last_resort = False
+            # - A round lasts while the singles have work, and ends once a more expensive technique has to run
+            if self.__singles or singles_units:
+                if stats is not None and not in_round:
+                    stats.iterations += 1
+                in_round = True
+            else:
+                in_round = False
+
+            if self.__singles:
+                solve_last_possible()
+            elif singles_units:
+                unit = (singles_units & -singles_units).bit_length() - 1
+                singles_units ^= 1 << unit
+                if unit < 2 * size:
+                    solve_line_singles(unit)
+                else:
+                    solve_block_singles(unit)
+            elif locked_units:
+                unit = (locked_units & -locked_units).bit_length() - 1
+                locked_units ^= 1 << unit
+                solve_locked_candidates(unit)
+            elif groups_units:
+                unit = (groups_units & -groups_units).bit_length() - 1
+                groups_units ^= 1 << unit
+                solve_naked_groups(unit)
+                solve_hidden_groups(unit)
+            elif fish_values:
+                val = (fish_values & -fish_values).bit_length() - 1
+                fish_values ^= 1 << val
+                # - Try larger fish only while the smaller ones find nothing
+                row_pos, col_pos = self.__fish_positions(val)
+                for fish_size, solve_fish in solve_fishes:
+                    solve_fish(val, fish_size, row_pos, col_pos)
+                    if self.__changed_units:
+                        break
+            elif not tried_xy_wing:
+                solve_xy_wing()
                 tried_xy_wing = True
-            elif self.unsolved == stuck and not tried_last_resort:
-                if Board.solution_count(self.grid) > 1:
+            elif not tried_last_resort:
+                # - Only the original board needs checking: a board with a value being tried has fewer solutions
+                num_solutions = Board.solution_count(self.grid) if self.__trail is None else 1
+                if num_solutions == 0:
+                    raise ValueError("The given board is invalid (there is no valid solution).")
+                if num_solutions > 1:
                     raise ValueError("The given board has more than one possible solution, and is therefore not a " +
                                      "valid Sudoku board.")
-                self.__solve_last_resort()
+                solve_last_resort()
                 tried_last_resort = True
-            elif self.unsolved == stuck:
+            else:
                 print(f"Possibilities when stuck: \n{self.poss_tostring()}")
                 raise RuntimeError("The given board cannot be solved with the currently implemented methods.")
-            else:
-                tried_xy_wing = False
-                tried_last_resort = False
-            stuck = self.unsolved
 
     def __solve_last_possible(self) -> None:
-        for idx, row in enumerate(self.poss):
-            for idy, col_poss in enumerate(row):
-                if len(col_poss) == 1:
-                    self.__set_tile(idx, idy, val=col_poss[0])
+        """Set the tiles that eliminations have left with a single possibility.
+        Called by self.__propagate().
+        """
+        popcount, lowbit, size = self.shape.popcount, self.shape.lowbit, self.shape.size
+        singles = self.__singles
+        while singles:
+            cell = singles.pop()
+            cands = self.cands[cell]
+            if popcount[cands] == 1:
+                self.__place(cell // size, cell % size, val=lowbit[cands], technique='last_possible')
 
-    def __solve_row_col(self, which_rc: int, rc_num: int, rc_has: List[List[bool]], val: int) -> int | None:
-        """Try to find a placement for a given value in either a row or a column.
-        Called by self.solve().
+    def __unit_has(self, unit: int) -> int:
+        """Given a unit, will return the bitmask of the values it contains.
 
         Args:
-            which_rc (int): 0 to look at a row, 1 to look at a column
-            rc_num (int): Index of the row or column
-            rc_has (List[List[bool]]): List of true/false based on what values are contained in the row or column
-            val (int): The value to try to find a placement for
-            poss (List[List[List]]): The current list of possibilities for the Board
+            unit (int): The unit's index into the shape's unit_cells (rows, then columns, then blocks)
 
         Returns:
-            int | None: Either the found placement for the value (row or column index), or None
+            int: The bitmask of the values contained in the unit.
         """
-        # - If the value is not already in the row or column..
-        if not rc_has[val]:
-            # - all_found will be equal to a list of all row/column indices at which the val is possible
-            all_found: List[int] = []
+        size = self.shape.size
+        if unit < size:
+            return self.row_has[unit]
+        if unit < 2 * size:
+            return self.col_has[unit - size]
+        return self.block_has[unit - 2 * size]
+
+    def __solve_hidden_singles(self, unit: int) -> None:
+        """Set each value that is only possible in one tile of a unit (a row, column, or block).
+        The values possible at least once and at least twice are found with one pass over the unit's possibilities.
+        Called by self.__propagate().
 
-            # - Generate the poss_group based on whether we are looking at a row or a column
-            poss_group = []
-            if which_rc:
-                for row_num in range(0, 9):
-                    poss_group.append(self.poss[row_num][rc_num])
-            else:
-                poss_group = self.poss[rc_num]
-
-            # - Find tiles for which the value is still possible
-            for idx, rc in enumerate(poss_group):
-                if val in rc:
-                    all_found.append(idx)
-
-            # - If exactly one possible position for the value was found, return that position
-            if len(all_found) == 1:
-                return all_found[0]
-            # - If more than one possible position for the value was found, try to narrow down the possibilities
-            elif len(all_found) > 1:
-                # - naked pairs
-                all_found_poss = [self.poss[idx][rc_num]for idx in all_found] if which_rc else [
-                    self.poss[rc_num][idy] for idy in all_found]
-                for idx, x in enumerate(all_found_poss):
-                    found_match = [(idx, x)]
-                    for idy, y in enumerate(all_found_poss):
-                        if idx != idy and x == y:
-                            found_match.append((idy, y))
-                    if len(found_match) == len(found_match[0][1]):
-                        for idz, _ in enumerate(all_found_poss):
-                            if idz not in [ind for (ind, _) in found_match]:
-                                for val in found_match[0][1]:
-                                    try:
-                                        if which_rc:
-                                            self.poss[all_found[idz]][rc_num].remove(val)
-                                        else:
-                                            self.poss[rc_num][all_found[idz]].remove(val)
-                                    except ValueError:
-                                        pass
-            # - If found in exactly 2 places, attempt to solve with an X Wing, and Swordfish
-            if len(all_found) == 2:
-                self.__solve_x_wing(which_rc, rc_num, val, all_found)
-                self.__solve_swordfish(which_rc, rc_num, val, all_found)
-        return None
+        Args:
+            unit (int): The unit's index into the shape's unit_cells (rows, then columns, then blocks)
 
-    def __solve_block(self, block_num: int, val: int) -> Tuple[int, int] | None:
-        """Try to find a placement for a given value in a block.
-        Called by self.solve().
+        Raises:
+            ValueError: If a value the unit does not contain is not possible anywhere in it.
+        """
+        cells = self.shape.unit_cells[unit]
+        cands = self.cands
+        once, twice = 0, 0
+        for cell in cells:
+            tile_cands = cands[cell]
+            twice |= once & tile_cands
+            once |= tile_cands
+        unit_has = self.__unit_has(unit)
+        if (once | unit_has) != self.shape.all_values:
+            raise ValueError("The given board is invalid (there is no valid solution).")
+        technique = 'block' if unit >= 2 * self.shape.size else 'row_col'
+        size = self.shape.size
+        for val in self.shape.mask_values[once & ~twice]:
+            bit = 1 << val
+            # - An earlier placement may have set the value elsewhere in the unit already
+            for cell in cells:
+                if cands[cell] & bit:
+                    self.__place(cell // size, cell % size, val=val, technique=technique)
+                    break
+
+    @staticmethod
+    def __find_subsets(masks: List[int], max_size: int) -> List[Tuple[int, int]]:
+        """Find the subsets of from 2 through max_size bitmasks whose union has as many values as the subset has
+        bitmasks (e.g. 2 tiles that can only hold the same 2 values, or 2 values that can only go in the same 2 tiles).
+        Subsets are built up one bitmask at a time, and a subset is not extended once its union has more than max_size
+        values, or once it has been found.
 
         Args:
-            block_num (int): The number of the block
-            val (int): The value to try to find a placement for
-
-        Returns:
-            Tuple[int, int] | None: Either the found placement for the value as a tuple of (row index, column index),
-                                    or None
-        """
-        # - Get the list of booleans showing which values the "block_num" block contains
-        block_has: List[bool] = self.block_has[block_num]
-        # - If the value is not already in the block..
-        if not block_has[val]:
-            # - all_found will be equal to a list of all tuples of (row, column) indices at which the val is possible
-            all_found: List[Tuple[int, int]] = []
-            # - Get (as a tuple) the ranges of row and columns within this block
-            block_range: Tuple[range, range] = Board.get_block_range(block_num)
-
-            # - Find tiles for which the value is still possible
-            for idx in block_range[0]:
-                for idy in block_range[1]:
-                    if val in self.poss[idx][idy]:
-                        all_found.append((idx, idy))
-
-            # - If exactly one possible position for the value was found, return that position
-            if len(all_found) == 1:
-                return all_found[0]
-            # - If more than one possible position for the value was found, try to narrow down the possibilities
-            elif len(all_found) > 1:
-                # - naked pairs
-                all_found_poss = [self.poss[idx][idy] for (idx, idy) in all_found]
-                for idx, poss_x in enumerate(all_found_poss):
-                    found_match = [(idx, poss_x)]
-                    for idy, poss_y in enumerate(all_found_poss):
-                        if idx != idy and poss_x == poss_y:
-                            found_match.append((idy, poss_y))
-                    if len(found_match) == len(found_match[0][1]):
-                        for idz, _ in enumerate(all_found_poss):
-                            if idz not in [ind for (ind, _) in found_match]:
-                                for val in found_match[0][1]:
-                                    try:
-                                        self.poss[all_found[idz][0]][all_found[idz][1]].remove(val)
-                                    except ValueError:
-                                        pass
-                # - pointing pairs/triples
-                found_row = all_found[0][0]
-                found_col = all_found[0][1]
-                for f in all_found[1:]:
-                    if f[0] != found_row:
-                        found_row = None
-                    if f[1] != found_col:
-                        found_col = None
-                if found_row is not None:
-                    keep_cols = [col for (row, col) in all_found]
-                    for idy, _ in enumerate(self.poss[found_row]):
-                        if idy not in keep_cols:
-                            try:
-                                self.poss[found_row][idy].remove(val)
-                            except ValueError:
-                                pass
-                if found_col is not None:
-                    keep_rows = [row for (row, col) in all_found]
-                    for idx, _ in enumerate(self.poss):
-                        if idx not in keep_rows:
-                            try:
-                                self.poss[idx][found_col].remove(val)
-                            except ValueError:
-                                pass
-        return None
+            masks (List[int]): The bitmasks
+            max_size (int): The largest subset to look for
 
-    def __solve_hidden_groups(self, block_num: int) -> None:
-        """Try to eliminate possibilities based on the Hidden Pairs/Triples/Quads/.. strategy.
-        If there exists a group of values, for which those values appear in groups in the same number of tiles as the
-        number of values (e.g. a group of 2 values exists in the same 2 tiles in the block and only those 2 tiles),
-        eliminate all other possibilities from those tiles.
-        Called by self.solve().
+        Returns:
+            List[Tuple[int, int]]: A tuple for each subset found, of a bitmask of the indices of its bitmasks (bit n for
+                masks[n]) and the union of its bitmasks.
+        """
+        found: List[Tuple[int, int]] = []
+        # - Bitmasks with more values than the largest subset cannot be in any subset
+        items: List[Tuple[int, int]] = [(1 << index, mask) for index, mask in enumerate(masks)
+                                        if mask.bit_count() <= max_size]
+        num_items = len(items)
+
+        def extend(start: int, chosen: int, union: int, size: int) -> None:
+            for pos in range(start, num_items):
+                index_bit, mask = items[pos]
+                new_union = union | mask
+                count = new_union.bit_count()
+                if count <= max_size:
+                    if size and count == size + 1:
+                        found.append((chosen | index_bit, new_union))
+                    elif size + 1 < max_size:
+                        extend(pos + 1, chosen | index_bit, new_union, size + 1)
+
+        if max_size >= 2 and num_items >= 2:
+            extend(0, 0, 0, 0)
+        return found
+
+    def __solve_naked_groups(self, unit: int) -> None:
+        """Try to eliminate possibilities based on the Naked Pairs/Triples/Quads strategy.
+        If a group of tiles in a unit can only hold as many values as there are tiles (e.g. 3 tiles that can only hold
+        values from the same 3 values), those values cannot be anywhere else in the unit.
+        Called by self.__propagate().
 
         Args:
-            block_num (int): The number of the block
-        """
-        # - Get (as a tuple) the ranges of row and columns within this block
-        block_range: Tuple[range, range] = Board.get_block_range(block_num)
-
-        # - For each tile in the block..
-        for idx in block_range[0]:
-            for idy in block_range[1]:
-                # - Get the possibilities for the tile
-                tile_poss: List[int] = self.poss[idx][idy]
-                if idx == 2 and idy == 8 and tile_poss == [0, 1, 7]:
-                    pass
-                # - If there are at least 3 possibilities..
-                # - (if there are 1 or 2 possibilities, this method could not reduce this number)
-                if len(tile_poss) >= 3:
-                    # - Count the number of occurances in all the block tiles of each possibility
-                    tile_poss_occur: Dict[int, int] = {val: 1 for val in tile_poss}
-                    # - Find the common values between the current tile and each other tile
-                    other_tiles_common: List[Tuple[int, int, List[int]]] = []
-
-                    # - For each other tile in the block..
-                    for other_idx in block_range[0]:
-                        for other_idy in block_range[1]:
-                            # - If it is not the same tile..
-                            if idx != other_idx or idy != other_idy:
-                                # - Get the possibilities that occur in both the original tile and the other tile
-                                common = list(set(tile_poss) & set(self.poss[other_idx][other_idy]))
-                                # - If the two tiles have at least 1 common possibility..
-                                if len(common) >= 1:
-                                    common.sort()
-                                    # - Add the indices and common values to other_tiles_common
-                                    other_tiles_common.append((other_idx, other_idy, common))
-                                    # - Increment the found occurences of the common possibilities
-                                    for poss_val in common:
-                                        tile_poss_occur[poss_val] += 1
-                    # - Map the occurence values to each possibility that occured that number of times
-                    tile_poss_occur_flipped: Dict[int, List[int]] = {}
-
-                    for key, value in tile_poss_occur.items():
-                        if value not in tile_poss_occur_flipped:
-                            tile_poss_occur_flipped[value] = [key]
-                        else:
-                            tile_poss_occur_flipped[value].append(key)
-
-                    # - For each key (num occurences) and value (list of possibilities that occurred that many times)..
-                    for key, value in tile_poss_occur_flipped.items():
-                        # - If the key (num occurrences) is at least 2 and is also equal to the length of the value
-                        # - (list of possibilities), and the tile currently has more possibilities than the number of
-                        # - values (possibilities that occurred that many times)
-                        # - e.g. If there are 2 possibilities that occurred 2 times, or
-                        # - 3 possibilities that occurred 3 times, etc.
-                        value_count = len(value)
-                        if key >= 2 and key == value_count and len(tile_poss) > value_count:
-                            # - This list will hold all of the indices where every val in value is found
-                            found = []
-                            # - For each set of common values that we found earlier..
-                            for common in other_tiles_common:
-                                # - If every val in values is found in common..
-                                num_values_in_common = len(list(set(value) & set(common[2])))
-                                if num_values_in_common == value_count:
-                                    # - Add the indices to 'found'
-                                    found.append(common[:2])
-                            # - If the number of tiles where every val in value was found is the same as the number of
-                            # - occurrences of those values (i.e. those values occur in those places and nowhere else),
-                            # - this is a hidden group (pair/triple/etc)
-                            if key == len(found) + 1:
-                                # - Remove all other possible values from each of the found grouped tiles
-                                for modif_idx, modif_idy in [(idx, idy)] + found:
-                                    self.poss[modif_idx][modif_idy] = value
-
-    def __solve_x_wing(self, which_rc: int, rc_num: int, val: int, pair: List[int]) -> None:
-        """Try to eliminate possibilities based on the X Wing strategy.
-        If a value exists in exactly 2 places in a row or column ('pair', given), and there exists a second row or
-        column in which the value exists in the same two places and only those places, eliminate the value from the
-        other tiles in the 2 matching rows or columns.
-        Called by self.solve().
+            unit (int): The unit's index into the shape's unit_cells (rows, then columns, then blocks)
+        """
+        cells: List[int] = [cell for cell in self.shape.unit_cells[unit] if self.cands[cell]]
+        for chosen, group in Board.__find_subsets([self.cands[cell] for cell in cells],
+                                                  min(SUBSET_MAX_SIZE, len(cells) // 2)):
+            for index, cell in enumerate(cells):
+                if not chosen >> index & 1:
+                    self.__eliminate(cell, group)
+
+    def __unit_positions(self, unit: int) -> List[int]:
+        """Given a unit, will return the bitmask of the positions at which each value is possible in it.
+
+        Args:
+            unit (int): The unit's index into the shape's unit_cells (rows, then columns, then blocks)
+
+        Returns:
+            List[int]: For each value, the bitmask of its positions (bit n for the unit's nth tile).
+        """
+        mask_values = self.shape.mask_values
+        positions: List[int] = [0] * self.shape.size
+        for index, cell in enumerate(self.shape.unit_cells[unit]):
+            for val in mask_values[self.cands[cell]]:
+                positions[val] |= 1 << index
+        return positions
+
+    def __solve_locked_candidates(self, unit: int) -> None:
+        """Try to eliminate possibilities based on the Locked Candidates strategy, in both directions. A value that is
+        only possible within one row or column of a block cannot be anywhere else in that row or column (pointing), and
+        a value that is only possible within one block of a row or column cannot be anywhere else in that block
+        (claiming). With the value's positions in the unit as a bitmask, each row, column, or block it could be locked
+        into is checked with a single mask.
+        Called by self.__propagate().
+
+        Args:
+            unit (int): The unit's index into the shape's unit_cells (rows, then columns, then blocks)
+        """
+        shape = self.shape
+        size, order, cell_units, unit_bits = shape.size, shape.order, shape.cell_units, shape.unit_bits
+        cells = shape.unit_cells[unit]
+        positions = self.__unit_positions(unit)
+        for val in shape.mask_values[shape.all_values & ~self.__unit_has(unit)]:
+            pos = positions[val]
+            if not pos:
+                continue
+            # - The units the value is locked into, found through the first tile of the segment or stripe
+            locked: List[int] = []
+            for seg, seg_mask in enumerate(shape.segment_masks):
+                if not pos & ~seg_mask:
+                    first = cell_units[cells[seg * order]]
+                    # - A block's row, or the block a row or column segment is in
+                    locked.append(first[0] if unit >= 2 * size else 2 * size + first[2])
+            if unit >= 2 * size:
+                for seg, stripe_mask in enumerate(shape.stripe_masks):
+                    if not pos & ~stripe_mask:
+                        locked.append(size + cell_units[cells[seg]][1])
+            # - Eliminate the value from the rest of each unit it is locked into
+            bit = 1 << val
+            for other in locked:
+                for cell in shape.unit_cells[other]:
+                    if not unit_bits[cell] >> unit & 1:
+                        self.__eliminate(cell, bit)
+
+    def __solve_hidden_groups(self, unit: int) -> None:
+        """Try to eliminate possibilities based on the Hidden Pairs/Triples/Quads strategy.
+        If a group of values can only go in as many tiles of a unit as there are values (e.g. 2 values that are only
+        possible in the same 2 tiles), eliminate all other possibilities from those tiles.
+        Called by self.__propagate().
+
+        Args:
+            unit (int): The unit's index into the shape's unit_cells (rows, then columns, then blocks)
+        """
+        cells: Tuple[int, ...] = self.shape.unit_cells[unit]
+        values: Tuple[int, ...] = self.shape.mask_values[self.shape.all_values & ~self.__unit_has(unit)]
+        positions = self.__unit_positions(unit)
+        for chosen, group in Board.__find_subsets([positions[val] for val in values],
+                                                  min(SUBSET_MAX_SIZE, len(values) // 2)):
+            keep = sum(1 << val for index, val in enumerate(values) if chosen >> index & 1)
+            for index in self.shape.mask_values[group]:
+                self.__eliminate(cells[index], ~keep & self.shape.all_values)
+
+    def __fish_positions(self, val: int) -> Tuple[List[int], List[int]]:
+        """Given a value, will return the bitmasks of where it is possible in each row and column.
+
+        Args:
+            val (int): The value
+
+        Returns:
+            Tuple[List[int], List[int]]: A tuple of the bitmask of the columns at which the value is possible in each
+                row, and the bitmask of the rows at which it is possible in each column.
+        """
+        bit = 1 << val
+        cands = self.cands
+        size = self.shape.size
+        row_pos: List[int] = [0] * size
+        col_pos: List[int] = [0] * size
+        for idx, cells in enumerate(self.shape.row_cells):
+            for idy, cell in enumerate(cells):
+                if cands[cell] & bit:
+                    row_pos[idx] |= 1 << idy
+                    col_pos[idy] |= 1 << idx
+        return (row_pos, col_pos)
+
+    def __solve_fish(self, val: int, fish_size: int, row_pos: List[int], col_pos: List[int]) -> None:
+        """Try to eliminate possibilities based on the fish strategies: X Wing (2 lines), Swordfish (3 lines), and
+        Jellyfish (4 lines).
+        If a value is only possible within the same 'fish_size' columns in 'fish_size' rows (the base rows), each of
+        those columns must hold the value in one of the base rows, so the value is eliminated from the other rows of
+        those columns. A base row may have the value in fewer than 'fish_size' of the columns (a partial fish). The
+        same goes with rows and columns swapped.
+        Sets of base lines are found by the subset search used for naked and hidden groups, over the value's positions
+        in each line.
+        Called by self.__propagate().
 
         Args:
-            which_rc (int): 0 to look at a row, 1 to look at a column
-            rc_num (int): Index of the row or column
             val (int): The value to try to eliminate as a possibility
-            pair (List[int]): The pair of exactly 2 places at which the value exists in the given row or column.
+            fish_size (int): The number of base lines
+            row_pos (List[int]): The bitmask of the columns at which the value is possible in each row
+            col_pos (List[int]): The bitmask of the rows at which the value is possible in each column
         """
-        # - If working with columns, transpose self.poss
-        all_poss_groups = []
-        if which_rc:
-            all_poss_groups = [list(x) for x in zip(*self.poss)]
-        else:
-            all_poss_groups = self.poss
-
-        # - For every row or column..
-        for idx, rc_poss in enumerate(all_poss_groups):
-            # - If the row or column number is not equal to the same row or column that we have already found..
-            if idx != rc_num:
-                rc_has = self.col_has[idx] if which_rc else self.row_has[idx]
-
-                # - If the value is not already in the row or column..
-                if not rc_has[val]:
-                    all_found = []
-
-                    # - Find tiles for which the value is still possible
-                    for idy, rc in enumerate(rc_poss):
-                        if val in rc:
-                            all_found.append(idy)
-
-                    # - If found in exactly 2 places..
-                    if len(all_found) == 2:
-                        # - If the places found are the same as the pair we started with..
-                        if all_found[0] == pair[0] and all_found[1] == pair[1]:
-                            # - Eliminate the val from the other poss's in the same row or column that are not a part
-                            # - of the X Wing
-                            for idz, rc_elim_poss in enumerate(all_poss_groups):
-                                if idz != idx and idz != rc_num:
-                                    for idfound in all_found:
-                                        try:
-                                            rc_elim_poss[idfound].remove(val)
-                                        except ValueError:
-                                            pass
+        bit = 1 << val
+        size, unit_cells, mask_values = self.shape.size, self.shape.unit_cells, self.shape.mask_values
+        for which_rc, base_pos, cover_pos in ((0, row_pos, col_pos), (1, col_pos, row_pos)):
+            lines = [line for line in range(0, size) if base_pos[line]]
+            # - A fish of more than half of the lines leaves a smaller fish the other way around, found first
+            if 2 * fish_size > len(lines):
+                continue
+            for chosen, covers in Board.__find_subsets([base_pos[line] for line in lines], fish_size):
+                if chosen.bit_count() == fish_size:
+                    base = sum(1 << line for index, line in enumerate(lines) if chosen >> index & 1)
+                    for cover in mask_values[covers]:
+                        for line in mask_values[cover_pos[cover] & ~base]:
+                            self.__eliminate(unit_cells[which_rc * size + line][cover], bit)
 
     def __solve_xy_wing(self) -> None:
         """Try to eliminate possibilities based on the XY Wing strategy.
         Called by self.solve().
         """
         # - Find intersects: tiles with only 2 possibilities
-        # - Create an intersects list of [(row index, column index, List of wings)]
-        intersects: List[Tuple[int, int, List[Tuple[int, int]]]] = []
-        for idx, row in enumerate(self.poss):
-            for idy, col in enumerate(row):
-                if len(col) == 2:
-                    intersects.append((idx, idy, []))
+        # - Create an intersects list of [(tile index, List of wings)]
+        popcount, peer_sets = self.shape.popcount, self.shape.peer_sets
+        intersects: List[Tuple[int, List[int]]] = [(cell, []) for cell, cands in enumerate(self.cands)
+                                                   if popcount[cands] == 2]
 
         # - Find the possible wings for each intersect
-        for idx, idy, wings in intersects:
+        for cell, wings in intersects:
+            cell_peers = peer_sets[cell]
             # - The possible wings should be made up of other possible intersects
-            for wing_idx, wing_idy, _ in intersects:
-                # - A wing cannot be the same tile as the intersect
-                if idx != wing_idx or idy != wing_idy:
-                    # - A wing has to have the same row, column, or block as the intersect
-                    if idx == wing_idx or idy == wing_idy or \
-                       Board.get_block_num(idx, idy) == Board.get_block_num(wing_idx, wing_idy):
-                        # - A wing cannot have the exact same possibilites as the intersect
-                        if self.poss[idx][idy] != self.poss[wing_idx][wing_idy]:
-                            # - A wing must have one of the same possibilities as the intersect
-                            for val in self.poss[idx][idy]:
-                                if val in self.poss[wing_idx][wing_idy]:
-                                    wings.append((wing_idx, wing_idy))
-                                    break
+            for wing, _ in intersects:
+                # - A wing has to be a peer of the intersect (so not the same tile), in the same row, column, or block
+                if wing in cell_peers:
+                    # - A wing cannot have the exact same possibilites as the intersect, and must have one of the
+                    # - same possibilities as the intersect
+                    if self.cands[cell] != self.cands[wing] and self.cands[cell] & self.cands[wing]:
+                        wings.append(wing)
 
         # - For each intersect..
-        for idx, idy, wings in intersects:
-            intersect = self.poss[idx][idy]
+        for cell, wings in intersects:
+            intersect = self.cands[cell]
             # - For each possible wing of that intersect..
-            for wing_row, wing_col in wings:
-                wing_poss = self.poss[wing_row][wing_col]
-                uncommon = list(set(intersect) ^ set(wing_poss))
+            for wing in wings:
+                wing_peers = peer_sets[wing]
+                wing_cands = self.cands[wing]
+                uncommon = intersect ^ wing_cands
                 # - Try to find a second wing
-                for second_wing_row, second_wing_col in wings:
+                for second_wing in wings:
                     # - The second wing cannot intersect the first wing
-                    if wing_row != second_wing_row and wing_col != second_wing_col and \
-                        Board.get_block_num(wing_row, wing_col) != Board.get_block_num(second_wing_row,
-                                                                                       second_wing_col):
-                        second_wing_poss = self.poss[second_wing_row][second_wing_col]
+                    if second_wing != wing and second_wing not in wing_peers:
+                        second_wing_cands = self.cands[second_wing]
                         # - The values that are only in one of intersect's or the first wing's possibilities,
                         # - but not in both, must be equal to the second wing's possibilities
-                        if uncommon == second_wing_poss:
+                        if uncommon == second_wing_cands:
                             # - Remove the common value that both of the wing's have from everywhere that intersects
                             # - both of the wings
-                            common = list(set(wing_poss) & set(second_wing_poss))[0]
-                            # - Remove where tile intersects one wing's row and the other wing's column
-                            try:
-                                self.poss[wing_row][second_wing_col].remove(common)
-                            except ValueError:
-                                pass
-                            try:
-                                self.poss[second_wing_row][wing_col].remove(common)
-                            except ValueError:
-                                pass
-                            # - Remove where tile intersects one wing's block, and the other wing's row or column
-                            for wing_idx, wing_idy, other_idx, other_idy in \
-                                [(wing_row, wing_col, second_wing_row, second_wing_col),
-                                 (second_wing_row, second_wing_col, wing_row, wing_col)]:
-                                block_num = Board.get_block_num(wing_idx, wing_idy)
-                                block_range = Board.get_block_range(block_num)
-                                for block_idx in block_range[0]:
-                                    for block_idy in block_range[1]:
-                                        if block_idx == other_idx or block_idy == other_idy:
-                                            try:
-                                                self.poss[block_idx][block_idy].remove(common)
-                                            except ValueError:
-                                                pass
-
-    def __solve_swordfish(self, which_rc: int, rc_num: int, val: int, pair: List[int]) -> None:
-        """Try to eliminate possibilities based on the Swordfish strategy. Similar to the X Wing strategy, but with
-        3 rows or columns.
-        If a value exists in exactly 2 places in a row or column ('pair', given) and there exists two additional rows
-        or columns in which the value exists in exactly 2 places, if the original row or column and the first additional
-        row or column intersect in one place, the original row or column and the second additional row or column
-        intersect in one place, and the two additional rows or columns intersect in one place, eliminate the value from
-        the other tiles in the 3 intersecting rows or columns.
-        Called by self.solve().
-
-        Args:
-            which_rc (int): 0 to look at a row, 1 to look at a column
-            rc_num (int): Index of the row or column
-            val (int): The value to try to eliminate as a possibility
-            pair (List[int]): The pair of exactly 2 places at which the value exists in the given row or column.
-        """
-        found_rc: List[int] = [rc_num]
-        found_pairs: List[List[int]] = [pair]
-
-        # - If working with columns, transpose self.poss
-        all_poss_groups = []
-        if which_rc:
-            all_poss_groups = [list(x) for x in zip(*self.poss)]
-        else:
-            all_poss_groups = self.poss
-
-        # - For every row or column..
-        for idx, rc_poss in enumerate(all_poss_groups):
-            # - If the row or column number is not equal to the same row or column that we have already found..
-            if idx != rc_num:
-                rc_has = self.col_has[idx] if which_rc else self.row_has[idx]
-
-                # - If the value is not already in the row or column..
-                if not rc_has[val]:
-                    all_found = []
-
-                    # - Find tiles for which the value is still possible
-                    for idy, rc in enumerate(rc_poss):
-                        if val in rc:
-                            all_found.append(idy)
-
-                    # - If found in exactly 2 places..
-                    if len(all_found) == 2:
-                        # - If of the places found, exactly one exists in the pair we already found..
-                        if (all_found[0] in pair and all_found[1] not in pair) or \
-                                (all_found[0] not in pair and all_found[1] in pair):
-                            # - Add both the current index and the found places to the appropriate lists
-                            found_rc.append(idx)
-                            found_pairs.append(all_found)
-
-        # - If found at least 2 additional pairs..
-        if len(found_pairs) >= 3:
-            # - For every combination of those additional pairs (original pair at index 0 is kept each time)
-            for comb in itertools.combinations(range(1, len(found_pairs)), 2):
-                # - Common value between the original and first found pair
-                common = list(set(found_pairs[0]) & set(found_pairs[comb[0]]))[0]
-                # - Common value between the original and the second found pair
-                second_common = list(set(found_pairs[0]) & set(found_pairs[comb[1]]))[0]
-                try:
-                    # - If there exists a common value between the first and second found pair..
-                    third_common = list(set(found_pairs[comb[0]]) & set(found_pairs[comb[1]]))[0]
-                    # - Eliminate the val from the other poss's in the same row or column that are not a part
-                    # - of the Swordfish
-                    for idz, rc_elim_poss in enumerate(all_poss_groups):
-                        if idz not in found_rc:
-                            for idfound in [common, second_common, third_common]:
-                                try:
-                                    rc_elim_poss[idfound].remove(val)
-                                except ValueError:
-                                    pass
-                except IndexError:
-                    pass
+                            common = wing_cands & second_wing_cands
+                            # - Remove where tile intersects one wing's row and the other wing's column, or one wing's
+                            # - block and the other wing's row or column (the tiles that are peers of both wings)
+                            for other in sorted(wing_peers & peer_sets[second_wing]):
+                                self.__eliminate(other, common)
 
     def __solve_last_resort(self) -> None:
-        """Try each possibility in a tile and eliminate possibilities that result in an unsolvable board.
+        """Try each possibility in the tile with the fewest possibilities, and eliminate possibilities that result in an
+        unsolvable board. Every change made while trying a possibility is recorded in the trail, so that a failed try
+        is undone by rolling back only those changes.
 
         Raises:
             ValueError: Every possibility for a tile has been tried, and none of them have resulted in a solvable board.
         """
-        # - For every tile..
-        for idx, row in enumerate(self.poss):
-            for idy, col_poss_vals in enumerate(row):
-                # - If the tile still has a number of possibilities..
-                if len(col_poss_vals) > 0:
-                    # - Try setting each possibility and continue solving. If this possibility results in an unsolvable
-                    # - puzzle, reset the board and try the next possibility.
-                    for poss_val in col_poss_vals:
-                        save_state = pickle.dumps(self)
-                        self.__set_tile(idx, idy, poss_val)
-                        try:
-                            return self.solve()
-                        except ValueError:
-                            loaded = pickle.loads(save_state)
-                            self.copy(loaded)
-                            self.poss[idx][idy].remove(poss_val)
-                    # - If each possibility has been tried, and none of them have been solvable, raise a ValueError
-                    raise ValueError("The given board is invalid (there is no valid solution).")
+        owns_trail = self.__trail is None
+        if owns_trail:
+            self.__trail = []
+        try:
+            # - Pick the tile with the fewest possibilities left (the first one, on a tie), so that as few values as
+            # - possible have to be tried
+            popcount = self.shape.popcount
+            cell = min((cell for cell, cands in enumerate(self.cands) if cands),
+                       key=lambda cell: popcount[self.cands[cell]], default=None)
+            if cell is not None:
+                # - Try setting each possibility and continue solving. If this possibility results in an
+                # - unsolvable puzzle, undo the changes and try the next possibility.
+                for poss_val in self.shape.mask_values[self.cands[cell]]:
+                    checkpoint = len(self.__trail)
+                    if self.__stats is not None:
+                        self.__stats.guesses += 1
+                        self.__stats.guess_depth += 1
+                        self.__stats.max_guess_depth = max(self.__stats.max_guess_depth, self.__stats.guess_depth)
+                    try:
+                        self.__place(*divmod(cell, self.shape.size), poss_val, technique='last_resort')
+                        return self.__propagate()
+                    except ValueError:
+                        self.__rollback(checkpoint)
+                        self.__eliminate(cell, 1 << poss_val)
+                    finally:
+                        if self.__stats is not None:
+                            self.__stats.guess_depth -= 1
+                # - If each possibility has been tried, and none of them have been solvable, raise a ValueError
+                raise ValueError("The given board is invalid (there is no valid solution).")
+        finally:
+            if owns_trail:
+                self.__trail = None
 
     def solve_recurse(self) -> None:
         """Solve the Board recursively (brute force).
@@ -750,6 +1172,10 @@ class Board:
         Raises:
             ValueError: If the Board is unsolveable.
         """
+        if not self.valid:
+            raise ValueError("The given board is invalid (a value repeats in a row, column, or block).")
+        # - NumPy is only needed here, so it is not loaded until a Board is first solved recursively
+        import numpy as np
         grid = np.array(self.grid_orig)
         grid = self.__solve_recurse_inner(grid)
         if grid is not None:
@@ -757,7 +1183,7 @@ class Board:
         else:
             raise ValueError("The given board is invalid (there is no valid solution).")
 
-    def __solve_recurse_inner(self, grid: np.ndarray) -> np.ndarray:
+    def __solve_recurse_inner(self, grid: 'np.ndarray') -> 'np.ndarray':
         """Inner method for self.solve_recurse().
 
         Args:
@@ -770,11 +1196,9 @@ class Board:
             for idy, col_val in enumerate(row):
                 if col_val is None:
                     col = grid[:, idy]
-
-                    block_num = Board.get_block_num(idx, idy)
-                    block_range = Board.get_block_range(block_num)
-                    block = grid[np.ix_(block_range[0], block_range[1])].flatten()
-                    for val in range(1, 10):
+                    block_num = self.shape.cell_units[idx * self.shape.size + idy][2]
+                    block = grid.take(self.shape.block_cells[block_num])
+                    for val in range(1, self.shape.size + 1):
                         if val not in row and val not in col and val not in block:
                             grid[idx][idy] = val
                             if self.__solve_recurse_inner(grid) is not None:
@@ -784,33 +1208,101 @@ class Board:
                     return None
         return grid
 
+    def solve_exact_cover(self) -> None:
+        """Solve the Board with Algorithm X over the Sudoku exact cover matrix, using dancing links.
+
+        Raises:
+            ValueError: If the Board is unsolveable.
+        """
+        for solution in sudoku_solutions(self.grid_orig, limit=1):
+            self.grid = solution
+            return
+        raise ValueError("The given board is invalid (there is no valid solution).")
+
+    @staticmethod
+    def solutions(grid: List[List[int]], limit: int | None = None) -> Iterator[List[List[int]]]:
+        """Enumerate the solutions of a grid with Algorithm X (dancing links).
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+            limit (int | None): The maximum number of solutions to find, or None to find all of them
+
+        Raises:
+            ValueError: If the values in the grid conflict with each other.
+
+        Returns:
+            Iterator[List[List[int]]]: An iterator over the solved grids.
+        """
+        return sudoku_solutions(grid, limit)
+
     @staticmethod
-    def solution_count(grid: List[List[int]]) -> None:
-        grid_np = np.array(grid)
-        return Board.__solution_count_inner(grid_np)
+    def exact_cover_count(grid: List[List[int]], limit: int | None = None) -> int:
+        """Count the solutions of a grid with Algorithm X (dancing links).
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+            limit (int | None): Stop counting once this many solutions are found, or None to count all of them
+
+        Returns:
+            int: The number of solutions found (0 if the values in the grid conflict with each other).
+        """
+        try:
+            matrix, _ = sudoku_exact_cover(grid)
+        except ValueError:
+            return 0
+        return matrix.count(limit)
 
     @staticmethod
-    def __solution_count_inner(grid: np.ndarray) -> int:
-        count = 0
-        for idx, row in enumerate(grid):
-            for idy, col_val in enumerate(row):
-                if col_val is None:
-                    col = grid[:, idy]
+    def solution_count(grid: List[List[int]], cap: int | None = 2) -> int:
+        """Count the solutions of a grid, stopping once 'cap' solutions are found.
 
-                    block_num = Board.get_block_num(idx, idy)
-                    block_range = Board.get_block_range(block_num)
-                    block = grid[np.ix_(block_range[0], block_range[1])].flatten()
-                    for val in range(1, 10):
-                        if val not in row and val not in col and val not in block:
-                            grid[idx][idy] = val
-                            inner_count = Board.__solution_count_inner(grid)
-                            if inner_count is not None:
-                                count += inner_count
-                            if count > 1:
-                                return count
-                            grid[idx][idy] = None
-                    return count
-        return 1
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+            cap (int | None): Stop counting once this many solutions are found (2 is enough to check that a grid has a
+                              unique solution), or None to count all of them
+
+        Returns:
+            int: The number of solutions found, at most 'cap'.
+        """
+        return SolutionCounter(grid).count(cap)[0]
+
+    @staticmethod
+    def grade(grid: List[List[int]]) -> Grade:
+        """Grade a puzzle by solving it with per-technique statistics. A technique counts as used if it set a tile or
+        eliminated a possibility.
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+        Raises:
+            ValueError: If the grid is invalid, or does not have a unique solution.
+            RuntimeError: If the grid cannot be solved with the currently implemented methods.
+
+        Returns:
+            Grade: The puzzle's grade.
+        """
+        stats = SolveStats()
+        Board(grid).solve(stats)
+        used = [technique for technique in TECHNIQUE_LEVELS
+                if stats.placed.get(technique, 0) or stats.eliminated.get(technique, 0)]
+        hardest = max(used, key=lambda technique: TECHNIQUE_LEVELS[technique], default='last_possible')
+        level = TECHNIQUE_LEVELS[hardest]
+        difficulty = next(name for name, max_level in DIFFICULTIES.items() if level <= max_level)
+        return Grade(level, stats.iterations, stats.max_guess_depth, hardest, difficulty)
+
+    @staticmethod
+    def count_solutions(grid: List[List[int]], cap: int | None = 2) -> Tuple[int, 'SearchStats']:
+        """Count the solutions of a grid, stopping once 'cap' solutions are found, and report how much searching it
+        took.
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+            cap (int | None): Stop counting once this many solutions are found, or None to count all of them
+
+        Returns:
+            Tuple[int, SearchStats]: The number of solutions found (at most 'cap'), and the search statistics.
+        """
+        return SolutionCounter(grid).count(cap)
 
     def __count_none(self) -> int:
         """Check how many None values exist in the Board's current grid.
@@ -825,13 +1317,6 @@ class Board:
                     count += 1
         return count
 
-    def __has_rem_poss(self) -> bool:
-        for row in self.poss:
-            for col_poss_vals in row:
-                if len(col_poss_vals) > 0:
-                    return True
-        return False
-
     def verify_board(self, solution: List[List[int]]) -> Tuple[int, int] | None:
         """Check if the Board's grid is equal to the given solution.
 
@@ -850,86 +1335,663 @@ class Board:
         return None if len(incorrect) == 0 else incorrect
 
 
-class BoardGenerator:
+class SearchStats:
+    """Statistics collected while searching for solutions"""
+
     def __init__(self) -> None:
-        pass
-
-    def generate(self):
-        grid: List[List[int]] = np.full((9, 9), None).tolist()
-        poss: List[int] = [x for x in range(1, 10)]
-        row_poss: List[List[int]] = np.full((9, 9), [x for x in range(1, 10)]).tolist()
-        col_poss: List[List[int]] = np.full((9, 9), [x for x in range(1, 10)]).tolist()
-        block_poss: List[List[int]] = np.full((9, 9), [x for x in range(1, 10)]).tolist()
-
-        solution = np.array(self.__gen_board_filled(grid, poss, row_poss, col_poss, block_poss)).tolist()
-
-        num_to_remove = int(random.randrange(40, 9 * 9 - 17 + 1) / 2)
-        for _ in range(0, num_to_remove):
-            self.__gen_board_removal(grid)
-        return (grid, solution)
-
-    def __gen_board_filled(self, grid, poss, row_poss, col_poss, block_poss):
-        for block_num in [0, 4, 8, 1, 2, 3, 5, 6, 7]:
-            idx_range, idy_range = Board.get_block_range(block_num)
-            for idx in idx_range:
-                for idy in idy_range:
-                    if grid[idx][idy] is None:
-                        remaining = list(set(poss) & set(row_poss[idx]) & set(
-                            col_poss[idy]) & set(block_poss[block_num]))
-                        while grid[idx][idy] is None:
-                            val = remaining[random.randrange(0, len(remaining))]
-                            grid[idx][idy] = val
-                            row_poss[idx].remove(val)
-                            col_poss[idy].remove(val)
-                            block_poss[block_num].remove(val)
-                            try:
-                                self.__gen_board_filled(grid, poss, row_poss, col_poss, block_poss)
-                            except ValueError:
-                                grid[idx][idy] = None
-                                row_poss[idx].append(val)
-                                col_poss[idy].append(val)
-                                block_poss[block_num].append(val)
-                                remaining.remove(val)
-        return grid
+        """Initialize a new, empty set of statistics"""
+        # - Number of values tried in a tile
+        self.nodes: int = 0
+        # - Number of times a tile was left with no possible values
+        self.dead_ends: int = 0
+        # - Largest number of tiles filled in at once
+        self.max_depth: int = 0
+        # - True if the search stopped at its limit on the number of values tried, before it was done
+        self.gave_up: bool = False
 
-    def __gen_board_removal(self, grid):
-        index1 = random.randrange(0, 9)
-        index2 = random.randrange(0, 9)
-        value1 = grid[index1][index2]
-        value2 = grid[index2][index1]
+    def __repr__(self) -> str:
+        return f"SearchStats(nodes={self.nodes}, dead_ends={self.dead_ends}, max_depth={self.max_depth}, " + \
+            f"gave_up={self.gave_up})"
 
-        if value1 is not None and value2 is not None:
-            grid[index1][index2] = None
-            grid[index2][index1] = None
-            b = Board(grid)
-            try:
-                b.solve()
-                if Board.solution_count(grid) > 1:
-                    raise RuntimeError
-            except ValueError:
-                grid[index1][index2] = value1
-                grid[index2][index1] = value2
-                self.__gen_board_removal(grid)
-            except RuntimeError:
-                grid[index1][index2] = value1
-                grid[index2][index1] = value2
+
+class SolutionCounter:
+    """Counts the solutions of a grid with a depth-first search over bitmasks of the possible values of each tile.
+    After each value is tried, tiles left with a single possible value, and values left with a single possible tile in
+    a row, column, or block, are filled in without branching (removing each value from the tile's peers), and an undo
+    log restores the bitmasks when the search steps back. The search branches on the empty tile with the fewest
+    possible values (minimum remaining values), or on the possible tiles of a value in a row, column, or block when
+    there are fewer of those."""
+
+    def __init__(self, grid: List[List[int]]) -> None:
+        """Initialize a new SolutionCounter
+
+        Args:
+            grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles (or an
+                                    n^2 x n^2 array of integers from 1 through n^2 for a board of order n)
+
+        Raises:
+            TypeError: If the number of rows is not the square of an order of at least 2.
+        """
+        # - Dimensions and bitmask tables of the grid's order
+        self.shape: BoardShape = BoardShape.of_grid(grid)
+        size = self.shape.size
+        # - Bitmasks of what values are contained in rows, columns, and blocks
+        self.row_has: List[int] = [0] * size
+        self.col_has: List[int] = [0] * size
+        self.block_has: List[int] = [0] * size
+        # - Value of each tile, indexed by row index * size + column index
+        self.values: List[int] = [col_val for row in grid for col_val in row]
+        # - Indices of the empty tiles
+        self.empty: List[int] = []
+        # - (row index, column index, block number) of each tile
+        self.units: List[Tuple[int, int, int]] = self.shape.cell_units
+        # - False if the values in the grid conflict with each other
+        self.valid: bool = True
+
+        for idx, row in enumerate(grid):
+            for idy, col_val in enumerate(row):
+                if col_val is None:
+                    self.empty.append(idx * size + idy)
+                else:
+                    bit = 1 << (col_val - 1)
+                    block_num = self.units[idx * size + idy][2]
+                    if (self.row_has[idx] | self.col_has[idy] | self.block_has[block_num]) & bit:
+                        self.valid = False
+                    self.row_has[idx] |= bit
+                    self.col_has[idy] |= bit
+                    self.block_has[block_num] |= bit
+
+    def clear_tile(self, idx: int, idy: int) -> int:
+        """Remove the value of a tile from the grid being counted.
+
+        Args:
+            idx (int): row index from 0 through 8
+            idy (int): column index from 0 through 8
+
+        Returns:
+            int: The value that was removed, from 1 through 9.
+        """
+        cell = idx * self.shape.size + idy
+        val = self.values[cell]
+        mask = ~(1 << (val - 1))
+        self.row_has[idx] &= mask
+        self.col_has[idy] &= mask
+        self.block_has[self.units[cell][2]] &= mask
+        self.values[cell] = None
+        self.empty.append(cell)
+        return val
+
+    def set_tile(self, idx: int, idy: int, val: int) -> None:
+        """Set a tile of the grid being counted, e.g. to put back a value removed with self.clear_tile().
+
+        Args:
+            idx (int): row index from 0 through 8
+            idy (int): column index from 0 through 8
+            val (int): value from 1 through 9
+        """
+        cell = idx * self.shape.size + idy
+        bit = 1 << (val - 1)
+        self.row_has[idx] |= bit
+        self.col_has[idy] |= bit
+        self.block_has[self.units[cell][2]] |= bit
+        self.values[cell] = val
+        self.empty.remove(cell)
+
+    def is_unique(self, max_nodes: int | None = None) -> bool:
+        """Check whether the grid being counted has exactly one solution, stopping the search at a second one.
+
+        Args:
+            max_nodes (int | None): Give up once this many values have been tried, or None to search until done
+
+        Returns:
+            bool: True if the grid has a unique solution (False if the search gave up before proving it).
+        """
+        count, stats = self.count(2, max_nodes)
+        return count == 1 and not stats.gave_up
+
+    def count(self, cap: int | None = 2, max_nodes: int | None = None) -> Tuple[int, SearchStats]:
+        """Count the solutions of the grid.
+
+        Args:
+            cap (int | None): Stop counting once this many solutions are found, or None to count all of them
+            max_nodes (int | None): Give up once this many values have been tried (setting the statistics' gave_up),
+                                    or None to search until done
+
+        Returns:
+            Tuple[int, SearchStats]: The number of solutions found (at most 'cap'), and the search statistics.
+        """
+        stats = SearchStats()
+        if not self.valid:
+            return (0, stats)
+        if not self.empty:
+            return (1, stats)
+
+        shape = self.shape
+        size, all_values, popcount = shape.size, shape.all_values, shape.popcount
+        cell_units, unit_cells, peers = shape.cell_units, shape.unit_cells, shape.peers
+        empty = list(self.empty)
+        # - Bitmasks of what values are contained in each unit (the rows, then the columns, then the blocks), and of
+        # - the possible values of each tile (0 once it is filled in)
+        unit_has: List[int] = self.row_has + self.col_has + self.block_has
+        cands: List[int] = [0] * shape.num_cells
+        for cell in empty:
+            idx, idy, block_num = cell_units[cell]
+            cands[cell] = all_values & ~(unit_has[idx] | unit_has[size + idy] | unit_has[2 * size + block_num])
+            if not cands[cell]:
+                return (0, stats)
+        # - Undo log: (tile index, previous candidate bitmask) for a changed bitmask, or (-1 - tile index, value bit)
+        # - for a filled in tile
+        trail: List[Tuple[int, int]] = []
+        num_left = len(empty)
+        count = 0
+
+        def fill(queue: List[Tuple[int, int]]) -> bool:
+            # - Fill in the queued (tile, value bit) pairs, then keep filling in tiles left with a single possible
+            # - value, and values left with a single possible tile in a unit, until there are none. Returns False as
+            # - soon as a tile or a value in a unit is left with no possible place.
+            nonlocal num_left
+            while True:
+                while queue:
+                    cell, bit = queue.pop()
+                    cell_cands = cands[cell]
+                    if not cell_cands:
+                        # - Already filled in: if it was with another value, the unit check below finds that the value
+                        # - no longer fits anywhere
+                        continue
+                    if not cell_cands & bit:
+                        return False
+                    idx, idy, block_num = cell_units[cell]
+                    trail.append((-1 - cell, bit))
+                    trail.append((cell, cell_cands))
+                    cands[cell] = 0
+                    unit_has[idx] |= bit
+                    unit_has[size + idy] |= bit
+                    unit_has[2 * size + block_num] |= bit
+                    num_left -= 1
+                    for peer in peers[cell]:
+                        peer_cands = cands[peer]
+                        if peer_cands & bit:
+                            trail.append((peer, peer_cands))
+                            peer_cands ^= bit
+                            cands[peer] = peer_cands
+                            if not peer_cands:
+                                return False
+                            if popcount[peer_cands] == 1:
+                                queue.append((peer, peer_cands))
+                if not num_left:
+                    return True
+                # - Bits set in 'once' are possible in at least one of a unit's tiles, and in 'twice' in at least two
+                for unit, cells in enumerate(unit_cells):
+                    once = twice = 0
+                    for cell in cells:
+                        twice |= once & cands[cell]
+                        once |= cands[cell]
+                    if once | unit_has[unit] != all_values:
+                        return False
+                    hidden = once & ~twice
+                    while hidden:
+                        bit = hidden & -hidden
+                        hidden ^= bit
+                        queue.append((next(cell for cell in cells if cands[cell] & bit), bit))
+                if not queue:
+                    return True
+
+        def undo(checkpoint: int) -> None:
+            nonlocal num_left
+            while len(trail) > checkpoint:
+                key, old = trail.pop()
+                if key >= 0:
+                    cands[key] = old
+                else:
+                    idx, idy, block_num = cell_units[-1 - key]
+                    unit_has[idx] ^= old
+                    unit_has[size + idy] ^= old
+                    unit_has[2 * size + block_num] ^= old
+                    num_left += 1
+
+        def search() -> None:
+            nonlocal count
+            depth = len(empty) - num_left
+            if depth > stats.max_depth:
+                stats.max_depth = depth
+            if not num_left:
+                count += 1
+                return
+
+            # - Find the empty tile with the fewest possible values
+            best, best_num = -1, size + 1
+            for cell in empty:
+                num = popcount[cands[cell]]
+                if 0 < num < best_num:
+                    best, best_num = cell, num
+                    if num == 2:
+                        break
+            # - fill() leaves every missing value of a unit with at least two possible tiles, so only a tile with more
+            # - than two possible values can be beaten by a value with fewer possible tiles in some unit
+            best_unit, best_bit = -1, 0
+            if best_num > 2:
+                for unit, cells in enumerate(unit_cells):
+                    missing = all_values & ~unit_has[unit]
+                    while missing:
+                        bit = missing & -missing
+                        missing ^= bit
+                        num = 0
+                        for cell in cells:
+                            if cands[cell] & bit:
+                                num += 1
+                                if num == best_num:
+                                    break
+                        if num < best_num:
+                            best_unit, best_bit, best_num = unit, bit, num
+                    if best_num == 2:
+                        break
+            # - Then try each possible value of the tile, or each possible tile of the value in its unit
+            if best_unit < 0:
+                best_cands = cands[best]
+                choices = []
+                while best_cands:
+                    bit = best_cands & -best_cands
+                    best_cands ^= bit
+                    choices.append((best, bit))
+            else:
+                choices = [(cell, best_bit) for cell in unit_cells[best_unit] if cands[cell] & best_bit]
+            checkpoint = len(trail)
+            for choice in choices:
+                if max_nodes is not None and stats.nodes >= max_nodes:
+                    stats.gave_up = True
+                    return
+                stats.nodes += 1
+                if fill([choice]):
+                    search()
+                else:
+                    stats.dead_ends += 1
+                undo(checkpoint)
+                if (cap is not None and count >= cap) or stats.gave_up:
+                    return
+
+        if fill([(cell, cands[cell]) for cell in empty if popcount[cands[cell]] == 1]):
+            search()
         else:
-            self.__gen_board_removal(grid)
+            stats.dead_ends += 1
+        return (count, stats)
+
+
+class BoardGenerator:
+    def __init__(self, seed: int | None = None, order: int = 3) -> None:
+        """Initialize a new BoardGenerator
+
+        Args:
+            seed (int | None): Seed for the generator's random number generator, or None for a random seed. Generators
+                               with the same seed produce the same sequence of boards.
+            order (int): The order of the boards to generate (3 for 9x9 boards, 4 for 16x16, 5 for 25x25)
+
+        Raises:
+            ValueError: If order is less than 2.
+        """
+        self.rng: random.Random = random.Random(seed)
+        # - Dimensions and bitmask tables of the boards to generate
+        self.shape: BoardShape = BoardShape.of(order)
+
+    def generate(self, difficulty: str | None = None,
+                 workers: int = 1) -> Tuple[List[List[int]], List[List[int]]]:
+        """Generate a random board with a unique solution.
+
+        Args:
+            difficulty (str | None): The DIFFICULTIES tier the board must be graded in, or None for any difficulty
+            workers (int): The number of worker processes digging out candidate boards for a difficulty
+
+        Raises:
+            ValueError: If difficulty is not one of DIFFICULTIES.
+            RuntimeError: If no board in the difficulty was found in GENERATE_MAX_TRIES candidates.
+
+        Returns:
+            Tuple[List[List[int]], List[List[int]]]: A tuple of the board's grid and its solution.
+        """
+        if difficulty is None:
+            solution = self.generate_filled()
+            grid = [list(row) for row in solution]
+            self.__gen_board_removal(grid, self.__random_removal_count())
+            return (grid, solution)
+        boards = self.generate_many(1, difficulty, workers)
+        try:
+            return next(boards)
+        finally:
+            boards.close()
+
+    def generate_many(self, count: int, difficulty: str,
+                      workers: int = 1) -> Iterator[Tuple[List[List[int]], List[List[int]]]]:
+        """Generate boards in a difficulty tier. Candidate boards are dug out and graded (in worker processes if
+        workers > 1), and those graded in the tier are kept. Each candidate has its own seed drawn from this generator,
+        and candidates are checked in the order they were seeded, so a seeded generator produces the same boards for
+        any number of workers.
+
+        Args:
+            count (int): The number of boards to generate
+            difficulty (str): The DIFFICULTIES tier the boards must be graded in
+            workers (int): The number of worker processes
+
+        Raises:
+            ValueError: If difficulty is not one of DIFFICULTIES.
+            RuntimeError: If no board in the difficulty was found in GENERATE_MAX_TRIES candidates in a row.
+
+        Yields:
+            Tuple[List[List[int]], List[List[int]]]: A tuple of each board's grid and its solution.
+        """
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty {difficulty!r}, expected one of {', '.join(DIFFICULTIES)}.")
+        tries = 0
+        if workers <= 1:
+            while count > 0:
+                candidate = _generate_candidate(self.rng.getrandbits(64), difficulty, self.shape.order)
+                tries += 1
+                if candidate is not None:
+                    yield candidate
+                    count -= 1
+                    tries = 0
+                elif tries >= GENERATE_MAX_TRIES:
+                    raise RuntimeError(f"No {difficulty} board was found in {GENERATE_MAX_TRIES} tries.")
+            return
+
+        # - Loading the process pool machinery is slow, so it is left out of the import unless it is used
+        from concurrent.futures import ProcessPoolExecutor
+        pending: Deque['Future'] = deque()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            while count > 0:
+                while len(pending) < workers * 2:
+                    pending.append(pool.submit(_generate_candidate, self.rng.getrandbits(64), difficulty,
+                                               self.shape.order))
+                candidate = pending.popleft().result()
+                tries += 1
+                if candidate is not None:
+                    yield candidate
+                    count -= 1
+                    tries = 0
+                elif tries >= GENERATE_MAX_TRIES:
+                    raise RuntimeError(f"No {difficulty} board was found in {GENERATE_MAX_TRIES} tries.")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def generate_candidate(self, difficulty: str) -> Tuple[List[List[int]], List[List[int]], Grade | None]:
+        """Dig out and grade one candidate board for a difficulty. Easy boards come from removing a random number of
+        values, and harder boards from removing as many values as possible.
+
+        Args:
+            difficulty (str): The DIFFICULTIES tier the board is meant for
+
+        Returns:
+            Tuple[List[List[int]], List[List[int]], Grade | None]: The board's grid, its solution, and its grade (None
+                if it cannot be solved with the currently implemented methods).
+        """
+        solution = self.generate_filled()
+        grid = [list(row) for row in solution]
+        if DIFFICULTIES[difficulty] == 0:
+            num_to_remove = self.__random_removal_count()
+        else:
+            num_to_remove = self.shape.num_cells
+        self.__gen_board_removal(grid, num_to_remove)
+        try:
+            return (grid, solution, Board.grade(grid))
+        except RuntimeError:
+            return (grid, solution, None)
+
+    def generate_filled(self) -> List[List[int]]:
+        """Generate a random, completely filled (solved) grid.
+        The blocks on the diagonal do not constrain each other, so they are filled with shuffled values first. The rest
+        is filled with an iterative depth-first search that always fills the tile with the fewest possible values next,
+        keeping a bitmask of the values not tried yet for each filled tile so a dead end steps back without copying.
+        After FILL_MAX_DEAD_ENDS dead ends per tile, the search starts over with new blocks on the diagonal.
+
+        Returns:
+            List[List[int]]: A 9x9 2D array of integers from 1 through 9 (n^2 x n^2 with values from 1 through n^2 for a
+                             generator of order n).
+        """
+        rng = self.rng
+        order, size, num_cells = self.shape.order, self.shape.size, self.shape.num_cells
+        all_values, popcount, mask_values, cell_units = \
+            self.shape.all_values, self.shape.popcount, self.shape.mask_values, self.shape.cell_units
+        max_dead_ends = FILL_MAX_DEAD_ENDS * num_cells
+        while True:
+            row_has, col_has, block_has = [0] * size, [0] * size, [0] * size
+            values = [0] * num_cells
+            for block_num in range(0, size, order + 1):
+                digits = list(range(0, size))
+                rng.shuffle(digits)
+                for cell, val in zip(self.shape.block_cells[block_num], digits):
+                    idx, idy, _ = cell_units[cell]
+                    bit = 1 << val
+                    values[cell] = val + 1
+                    row_has[idx] |= bit
+                    col_has[idy] |= bit
+                    block_has[block_num] |= bit
+
+            empty = [cell for cell in range(0, num_cells) if not values[cell]]
+            # - (tile, bitmask of the values not tried there yet) for each tile filled by the search, in fill order
+            stack: List[Tuple[int, int]] = []
+            dead_ends = 0
+            while dead_ends <= max_dead_ends:
+                # - Find the empty tile with the fewest possible values
+                best, best_cands, best_count = -1, 0, size + 1
+                for cell in empty:
+                    if not values[cell]:
+                        idx, idy, block_num = cell_units[cell]
+                        cands = all_values & ~(row_has[idx] | col_has[idy] | block_has[block_num])
+                        if popcount[cands] < best_count:
+                            best, best_cands, best_count = cell, cands, popcount[cands]
+                            if best_count <= 1:
+                                break
+                if best < 0:
+                    return [values[idx * size:idx * size + size] for idx in range(0, size)]
+                if best_count:
+                    stack.append((best, best_cands))
+                else:
+                    dead_ends += 1
+                # - Fill the top of the stack with a value it has not tried yet, stepping back while it has none left
+                while stack:
+                    cell, cands = stack[-1]
+                    idx, idy, block_num = cell_units[cell]
+                    if values[cell]:
+                        bit = 1 << (values[cell] - 1)
+                        row_has[idx] ^= bit
+                        col_has[idy] ^= bit
+                        block_has[block_num] ^= bit
+                        values[cell] = 0
+                    if cands:
+                        choices = mask_values[cands]
+                        val = choices[rng.randrange(0, len(choices))]
+                        bit = 1 << val
+                        stack[-1] = (cell, cands ^ bit)
+                        values[cell] = val + 1
+                        row_has[idx] |= bit
+                        col_has[idy] |= bit
+                        block_has[block_num] |= bit
+                        break
+                    stack.pop()
+                else:
+                    # - The shuffled blocks on the diagonal cannot be completed (which can happen on 4x4 boards)
+                    break
+            # - Start over with freshly shuffled blocks on the diagonal: either they cannot be completed, or the search
+            # - ran into FILL_MAX_DEAD_ENDS dead ends per tile, and its run time is heavy-tailed past that point
+
+    def __random_removal_count(self) -> int:
+        """Pick a random number of pairs of values to remove from a filled grid, leaving from about 17 to 41 of a 9x9
+        grid's 81 values (and the same fractions of a larger grid's values).
+
+        Returns:
+            int: The number of pairs to remove.
+        """
+        num_cells = self.shape.num_cells
+        return int(self.rng.randrange(num_cells * 40 // 81, num_cells - num_cells * 17 // 81 + 1) / 2)
+
+    def __gen_board_removal(self, grid: List[List[int]], num_to_remove: int) -> None:
+        """Remove pairs of values from a filled grid (mirrored across the diagonal), keeping the solution unique.
+        Each pair is tried at most once, in a shuffled order, and a single SolutionCounter is updated as values are
+        removed or put back, so each try costs one capped solution count. A pair is also kept if the count gives up
+        after GENERATE_MAX_NODES values.
+
+        Args:
+            grid (List[List[int]]): The filled grid, modified in place
+            num_to_remove (int): The number of pairs to remove (fewer are removed if no other pair keeps the solution
+                                 unique)
+        """
+        checker = SolutionCounter(grid)
+        size = self.shape.size
+        pairs = [(idx, idy) for idx in range(0, size) for idy in range(idx, size)]
+        self.rng.shuffle(pairs)
+        removed = 0
+        for index1, index2 in pairs:
+            if removed == num_to_remove:
+                break
+            value1 = checker.clear_tile(index1, index2)
+            value2 = checker.clear_tile(index2, index1) if index1 != index2 else None
+            if checker.is_unique(GENERATE_MAX_NODES):
+                grid[index1][index2] = None
+                grid[index2][index1] = None
+                removed += 1
+            else:
+                checker.set_tile(index1, index2, value1)
+                if value2 is not None:
+                    checker.set_tile(index2, index1, value2)
+
+
+def _generate_candidate(seed: int, difficulty: str, order: int = 3) -> Tuple[List[List[int]], List[List[int]]] | None:
+    """Dig out and grade one candidate board for a difficulty, possibly in a worker process.
+
+    Args:
+        seed (int): Seed for the candidate's BoardGenerator
+        difficulty (str): The DIFFICULTIES tier the board must be graded in
+        order (int): The board order
+
+    Returns:
+        Tuple[List[List[int]], List[List[int]]] | None: The board's grid and its solution, or None if the board was
+            graded in another difficulty.
+    """
+    grid, solution, grade = BoardGenerator(seed, order).generate_candidate(difficulty)
+    if grade is None or grade.difficulty != difficulty:
+        return None
+    return (grid, solution)
+
+
+@functools.cache
+def sample_boards() -> List[Tuple[List[List[int]], List[List[int]]]]:
+    """Load the sample boards from test_boards, the first time they are needed.
+
+    Returns:
+        List[Tuple[List[List[int]], List[List[int]]]]: Each sample board's grid and its solution.
+    """
+    from test_boards import boards_sols
+    return boards_sols
+
+
+class SolveResult(NamedTuple):
+    """The outcome of solving one puzzle with solve_many()"""
+    # - The solved grid, or None if solving failed
+    grid: List[List[int]] | None
+    # - The error raised while solving, or None if the puzzle was solved
+    error: Exception | None
+
+
+def solve_one(grid: List[List[int]]) -> SolveResult:
+    """Solve a single puzzle, capturing any error instead of raising it.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+    Returns:
+        SolveResult: The solved grid, or the error raised while building or solving the Board.
+    """
+    try:
+        b = Board(grid)
+        b.solve()
+        return SolveResult(b.grid, None)
+    except (TypeError, ValueError, RuntimeError) as e:
+        return SolveResult(None, e)
+
+
+def _solve_chunk(grids: List[List[List[int]]]) -> Tuple[List[SolveResult], float]:
+    """Solve a chunk of puzzles in a worker process.
+
+    Args:
+        grids (List[List[List[int]]]): The puzzles to solve
+
+    Returns:
+        Tuple[List[SolveResult], float]: The results in the same order as the puzzles, and the seconds spent solving.
+    """
+    start = time.perf_counter()
+    results = [solve_one(grid) for grid in grids]
+    return (results, time.perf_counter() - start)
+
+
+def solve_many(grids: Iterable[List[List[int]]], workers: int | None = None,
+               chunksize: int | None = None) -> Iterator[SolveResult]:
+    """Solve many puzzles across a pool of worker processes.
+    Puzzles are read from 'grids' lazily and sent to the workers in chunks, with at most two chunks per worker in
+    flight, so memory stays flat for any number of puzzles. Unless 'chunksize' is given, chunks start with a single
+    puzzle and are resized from the measured solve time so that each chunk takes about SOLVE_MANY_CHUNK_SECONDS.
+
+    Args:
+        grids (Iterable[List[List[int]]]): The puzzles to solve
+        workers (int | None): The number of worker processes, or None to use one per CPU. With 1 worker, the puzzles
+                              are solved in this process.
+        chunksize (int | None): A fixed number of puzzles to send to a worker at once, or None to size chunks adaptively
+
+    Yields:
+        SolveResult: The result for each puzzle, in the same order as 'grids'. Errors raised while solving a puzzle
+                     are captured in its result and do not stop the batch.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for grid in grids:
+            yield solve_one(grid)
+        return
+
+    grids = iter(grids)
+    size = chunksize or 1
+    # - Smoothed number of seconds spent per puzzle, used to size the next chunks
+    per_puzzle: float | None = None
+    from concurrent.futures import ProcessPoolExecutor
+    pending: Deque['Future'] = deque()
+    exhausted = False
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while not exhausted and len(pending) < workers * 2:
+                chunk = list(itertools.islice(grids, size))
+                if chunk:
+                    pending.append(pool.submit(_solve_chunk, chunk))
+                else:
+                    exhausted = True
+            if not pending:
+                return
+            results, elapsed = pending.popleft().result()
+            yield from results
+            if chunksize is None:
+                chunk_per_puzzle = elapsed / len(results)
+                per_puzzle = chunk_per_puzzle if per_puzzle is None else (per_puzzle + chunk_per_puzzle) / 2
+                size = SOLVE_MANY_MAX_CHUNKSIZE if per_puzzle <= 0 else \
+                    max(1, min(SOLVE_MANY_MAX_CHUNKSIZE, int(SOLVE_MANY_CHUNK_SECONDS / per_puzzle)))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
 
 if __name__ == '__main__':
+    boards_sols = sample_boards()
     chosen = -1
     recurse_toggle = False
+    dlx_toggle = False
     while chosen != 'q':
         options = [i for i, _ in enumerate(boards_sols)]
         default_val = options[-1]
         chosen = input(f"Choose a number out of {options} (hit enter for default value: {default_val}), " +
-                       "'g' to generate a random board, 'r' to toggle using recursive solve, 'q' to exit): ")
+                       "'g' to generate a random board, 'r' to toggle using recursive solve, " +
+                       "'d' to toggle using dancing links, 'q' to exit): ")
         e = 'You have not entered a valid number from the given options.'
         if chosen == 'q':
             exit(0)
         elif chosen == 'r':
             recurse_toggle = not recurse_toggle
+        elif chosen == 'd':
+            dlx_toggle = not dlx_toggle
         else:
             try:
                 grid, solution = [], []
@@ -952,6 +2014,9 @@ if __name__ == '__main__':
                     if recurse_toggle:
                         print('Solving recursively.')
                         b.solve_recurse()
+                    elif dlx_toggle:
+                        print('Solving with dancing links.')
+                        b.solve_exact_cover()
                     else:
                         b.solve()
                     print('Solved:')
@@ -959,7 +2024,7 @@ if __name__ == '__main__':
                     print(e)
                     print('Unsolved:')
                 print(b)
-                if recurse_toggle:
+                if recurse_toggle or dlx_toggle:
                     print(b.grid)
                 v = b.verify_board(solution)
                 print(f'Verified: {v if v is not None else True}\n')
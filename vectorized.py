@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# vectorized.py
+import itertools
+import numpy as np
+from typing import Iterable, Iterator, List
+from solvedoku import BoardShape, SolveResult, solve_many
+
+# - Dimensions and unit tables of 9x9 boards
+SHAPE: BoardShape = BoardShape.of(3)
+# - Indices of the tiles in each unit: rows are units 0 through 8, columns 9 through 17, and blocks 18 through 26
+UNITS: np.ndarray = np.array(SHAPE.unit_cells)
+# - Indices in UNITS of the 3 units (row, column, block) of each tile
+CELL_UNIT_INDICES: np.ndarray = np.array([(idx, SHAPE.size + idy, 2 * SHAPE.size + block_num)
+                                          for idx, idy, block_num in SHAPE.cell_units])
+# - Position of each tile in the flattened (27 units x 9 tiles) array, once for each of its 3 units
+CELL_POS: np.ndarray = np.array([[unit * SHAPE.size + SHAPE.unit_cells[unit].index(cell) for unit in units]
+                                 for cell, units in enumerate(CELL_UNIT_INDICES)])
+# - Shift and bit of each value in a candidate bitmask
+DIGIT_SHIFTS: np.ndarray = np.arange(0, 9, dtype=np.uint16)
+DIGIT_BITS: np.ndarray = np.left_shift(np.uint16(1), DIGIT_SHIFTS)
+# - Number of set bits for every 9-bit mask
+POPCOUNT_TABLE: np.ndarray = np.array(SHAPE.popcount, dtype=np.uint8)
+# - Candidate bitmask for each value a tile can hold in a grid
+VALUE_MASKS: dict = {None: SHAPE.all_values, **{val: 1 << (val - 1) for val in range(1, 10)}}
+
+
+def grid_to_masks(grid: List[List[int]]) -> List[int]:
+    """Convert a grid to the candidate bitmask of each tile.
+
+    Args:
+        grid (List[List[int]]): A 9x9 2D array of integers from 1 through 9, or None for empty tiles
+
+    Raises:
+        TypeError: If grid has the wrong dimensions, or contains values that are not integers from 1 through 9
+
+    Returns:
+        List[int]: 81 candidate bitmasks, in row-major order.
+    """
+    try:
+        if len(grid) == 9 and all(len(row) == 9 for row in grid):
+            return [VALUE_MASKS[val] for row in grid for val in row]
+    except (TypeError, KeyError):
+        pass
+    raise TypeError("The given value for 'arr' is not a 9x9 list of integers.")
+
+
+def masks_to_grid(masks: Iterable[int]) -> List[List[int]]:
+    """Convert candidate bitmasks back to a grid, leaving tiles with more than one possibility empty.
+
+    Args:
+        masks (Iterable[int]): 81 candidate bitmasks, in row-major order
+
+    Returns:
+        List[List[int]]: A 9x9 2D array of integers from 1 through 9, or None for unsolved tiles.
+    """
+    values = [int(mask).bit_length() if SHAPE.popcount[mask] == 1 else None for mask in masks]
+    return [values[idx * 9:idx * 9 + 9] for idx in range(0, 9)]
+
+
+def propagate(masks: np.ndarray) -> np.ndarray:
+    """Apply naked singles, hidden singles, and unit eliminations to many boards at once, until no board changes.
+    Boards stop being processed as soon as they stop changing or reach a contradiction.
+
+    Args:
+        masks (np.ndarray): An (N, 81) uint16 array of candidate bitmasks, one row per board. Updated in place.
+
+    Returns:
+        np.ndarray: An (N,) boolean array, True for each board that reached a contradiction (has no solution).
+    """
+    failed = np.zeros(len(masks), dtype=bool)
+    active = np.arange(0, len(masks))
+    while active.size:
+        board_masks = masks[active]
+        before = board_masks
+        num = len(active)
+
+        # - Naked singles and unit eliminations: remove every solved value from the other tiles of its units
+        counts = POPCOUNT_TABLE[board_masks]
+        singles = np.where(counts == 1, board_masks, np.uint16(0))
+        unit_singles = np.bitwise_or.reduce(singles[:, UNITS], axis=2)
+        peer_singles = np.bitwise_or.reduce(unit_singles[:, CELL_UNIT_INDICES], axis=2)
+        board_masks = np.where(counts == 1, board_masks, board_masks & ~peer_singles)
+
+        # - Hidden singles: a value that fits in exactly one tile of a unit is placed in that tile
+        unit_bits = ((board_masks[:, :, None] >> DIGIT_SHIFTS) & 1)[:, UNITS]
+        digit_counts = unit_bits.sum(axis=2)
+        hidden = unit_bits * (digit_counts == 1)[:, :, None, :]
+        hidden_masks = (hidden * DIGIT_BITS).sum(axis=3, dtype=np.uint16)
+        hidden_cells = np.bitwise_or.reduce(hidden_masks.reshape(num, 27 * 9)[:, CELL_POS], axis=2)
+        board_masks = np.where(hidden_cells != 0, board_masks & hidden_cells, board_masks)
+
+        # - Contradictions: an empty tile, a value with no place left in a unit, a tile that is the only place for
+        # - two values, or the same value solved twice in a unit
+        single_bits = ((singles[:, :, None] >> DIGIT_SHIFTS) & 1)[:, UNITS].sum(axis=2)
+        bad = (board_masks == 0).any(axis=1) | (digit_counts == 0).any(axis=(1, 2)) | \
+            (POPCOUNT_TABLE[hidden_cells] > 1).any(axis=1) | (single_bits > 1).any(axis=(1, 2))
+
+        masks[active] = board_masks
+        failed[active[bad]] = True
+        changed = (board_masks != before).any(axis=1)
+        active = active[changed & ~bad]
+    return failed
+
+
+def solve_batch(grids: Iterable[List[List[int]]], batch_size: int = 4096,
+                workers: int = 1) -> Iterator[SolveResult]:
+    """Solve many puzzles, propagating singles on whole batches of boards at once with NumPy. Only boards that
+    propagation cannot finish are handed (partially solved) to Board.solve(), through solve_many().
+
+    Args:
+        grids (Iterable[List[List[int]]]): The puzzles to solve
+        batch_size (int): The number of boards to propagate at once
+        workers (int): The number of worker processes for the boards that propagation cannot finish
+
+    Yields:
+        SolveResult: The result for each puzzle, in the same order as 'grids'.
+    """
+    grids = iter(grids)
+    while True:
+        batch = list(itertools.islice(grids, batch_size))
+        if not batch:
+            return
+
+        results: List[SolveResult | None] = [None] * len(batch)
+        rows: List[List[int]] = []
+        positions: List[int] = []
+        for pos, grid in enumerate(batch):
+            try:
+                rows.append(grid_to_masks(grid))
+                positions.append(pos)
+            except TypeError as e:
+                results[pos] = SolveResult(None, e)
+
+        stalled: List[List[List[int]]] = []
+        stalled_positions: List[int] = []
+        if rows:
+            masks = np.array(rows, dtype=np.uint16)
+            # - Before propagating, the givens are the only tiles with a single possibility
+            givens = np.where(POPCOUNT_TABLE[masks] == 1, masks, np.uint16(0))
+            repeated = (((givens[:, :, None] >> DIGIT_SHIFTS) & 1)[:, UNITS].sum(axis=2) > 1).any(axis=(1, 2))
+            failed = propagate(masks)
+            solved = (POPCOUNT_TABLE[masks] == 1).all(axis=1)
+            for pos, board_masks, board_repeated, board_failed, board_solved in zip(positions, masks.tolist(), repeated,
+                                                                                    failed, solved):
+                if board_repeated:
+                    results[pos] = SolveResult(None, ValueError("The given board is invalid (a value repeats in a " +
+                                                                "row, column, or block)."))
+                elif board_failed:
+                    results[pos] = SolveResult(None, ValueError("The given board is invalid (there is no valid " +
+                                                                "solution)."))
+                elif board_solved:
+                    results[pos] = SolveResult(masks_to_grid(board_masks), None)
+                else:
+                    stalled.append(masks_to_grid(board_masks))
+                    stalled_positions.append(pos)
+
+        for pos, result in zip(stalled_positions, solve_many(stalled, workers=workers)):
+            results[pos] = result
+        yield from results